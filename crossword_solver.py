@@ -1,10 +1,1315 @@
+import time
+STARTUP_T0 = time.perf_counter()
+
 import tkinter as tk
-from tkinter import filedialog, messagebox, font
-import puz
+from tkinter import filedialog, messagebox, simpledialog, font
 import os
 import re
-import html
 import json
+import math
+import threading
+import queue
+import multiprocessing
+import zlib
+import bisect
+import sys
+import select
+import struct
+from collections import OrderedDict, deque
+# puz, html and concurrent.futures are imported on first use to keep startup fast
+
+LIBRARY_INDEX_FILE = "library_index.json"
+MAX_SESSIONS = 6
+SESSION_CELL_BUDGET = 12000
+UNDO_LIMIT = 1000
+JOURNAL_DIR = "journals"
+JOURNAL_COMPACT = 500
+GRID_CULL_MARGIN = 2
+GRID_MAX_REQUEST = 700
+GRID_LINE_COLOR = "#555555"
+SIDEBAR_DEBOUNCE = 0.3
+SIDEBAR_MAX_DELAY = 2.0
+THUMBNAIL_CACHE_FILE = "thumbnails.json"
+THUMBNAIL_MEMORY = 300
+COOP_DEFAULT_PORT = 8765
+COOP_MAX_BUFFER = 1024 * 1024
+COOP_CHUNK = 1000
+LIBRARY_INDEX_VERSION = 1
+LIBRARY_STATS_FILE = "library_stats.json"
+WORDLIST_FILE = "wordlist.txt"
+# (key, sidebar heading, value format) of each per-puzzle metric
+LIBRARY_METRICS = (("words", "Words", "{:.0f}"), ("avg_len", "Avg Len", "{:.1f}"), ("blocks", "Blocks %", "{:.0f}"),
+                   ("unchecked", "Unchecked", "{:.0f}"), ("short", "3-Letter %", "{:.0f}"), ("familiarity", "Familiar %", "{:.0f}"))
+CLUE_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def clean_clue_text(text):
+    if not text: return ""
+    import html
+    text = re.sub(r'<[^>]+>', '', text)
+    text = html.unescape(text)
+    return text
+
+def iter_entries(puzzle, numbering=None):
+    # Yields (direction, num, cell, clean clue text, answer) for every entry, across first
+    if numbering is None: numbering = puzzle.clue_numbering()
+    for direction, clue_list in (('across', numbering.across), ('down', numbering.down)):
+        step = 1 if direction == 'across' else puzzle.width
+        for clue in clue_list:
+            answer = "".join(puzzle.solution[clue['cell'] + i * step] for i in range(clue['len']))
+            yield direction, clue['num'], clue['cell'], clean_clue_text(clue['clue']), answer
+
+# --- Zip archives ---
+# A member of an archive is addressed as <archive path>/<member name>, e.g. "2019.zip/jan01.puz",
+# so saves, favorites and the sidebar can treat archives like folders. The central directory of
+# each archive is read once and cached; members are read by seeking to their local header.
+_archive_cache = {}
+
+def split_archive_path(path):
+    # Returns (archive, member) for a path inside a .zip, or (None, path) for a plain file
+    parts = os.path.normpath(path).split(os.sep)
+    for i in range(len(parts), 0, -1):
+        head = os.sep.join(parts[:i]) or os.sep
+        if head.lower().endswith('.zip') and os.path.isfile(head):
+            return head, "/".join(parts[i:])
+    return None, path
+
+def archive_index(archive):
+    import zipfile
+    st = os.stat(archive)
+    cached = _archive_cache.get(archive)
+    if cached and cached[0] == (st.st_mtime_ns, st.st_size): return cached[1]
+    with zipfile.ZipFile(archive) as zf:
+        members = {info.filename: info for info in zf.infolist() if info.filename.lower().endswith('.puz')}
+    _archive_cache[archive] = ((st.st_mtime_ns, st.st_size), members)
+    return members
+
+def read_archive_member(archive, member):
+    import zipfile
+    info = archive_index(archive)[member]
+    if not info.flag_bits & 0x1 and info.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        with open(archive, 'rb') as f:
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_len, extra_len = struct.unpack("<HH", header[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            data = f.read(info.compress_size)
+        if info.compress_type == zipfile.ZIP_DEFLATED: data = zlib.decompress(data, -15)
+        return data
+    with zipfile.ZipFile(archive) as zf: return zf.read(member)
+
+def list_archive_folder(archive, prefix=""):
+    # Members below prefix, relative to it; nested paths are kept as "sub/name.puz"
+    prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+    return sorted(m[len(prefix):] for m in archive_index(archive) if m.startswith(prefix))
+
+def read_puzzle(path):
+    import puz
+    archive, member = split_archive_path(path)
+    if archive is None: return puz.read(path)
+    return puz.load(read_archive_member(archive, member))
+
+def puzzle_exists(path):
+    archive, member = split_archive_path(path)
+    if archive is None: return os.path.isfile(path)
+    try: return member in archive_index(archive)
+    except Exception: return False
+
+def puzzle_mtime(path):
+    archive, member = split_archive_path(path)
+    return os.path.getmtime(archive or path)
+
+def find_puzzles(folder):
+    # {absolute path: mtime} of every .puz below folder, including members of .zip archives
+    found = {}
+    for dirpath, dirnames, filenames in os.walk(folder):
+        for f in filenames:
+            full_p = os.path.abspath(os.path.join(dirpath, f))
+            try:
+                if f.lower().endswith('.puz'):
+                    found[full_p] = os.path.getmtime(full_p)
+                elif f.lower().endswith('.zip'):
+                    mtime = os.path.getmtime(full_p)
+                    for member in archive_index(full_p):
+                        found[os.path.join(full_p, *member.split("/"))] = mtime
+            except Exception: pass
+    return found
+
+def clue_tokens(text):
+    return set(CLUE_TOKEN_RE.findall(text.lower()))
+
+def _index_puz_file(path):
+    # Runs in a worker process; must stay a module-level function so it can be pickled
+    try:
+        mtime = puzzle_mtime(path)
+        puzzle = read_puzzle(path)
+        entries = [[d, num, clue, answer] for d, num, cell, clue, answer in iter_entries(puzzle)]
+        return path, mtime, entries
+    except Exception:
+        return path, None, None
+
+# --- Puzzle statistics ---
+_analyzer_words = None
+
+def load_wordlist(path):
+    # One answer per line, optionally "WORD;score" as in the common crossword wordlists.
+    # Scored words count as familiar from 50 up; returns None when there is no wordlist.
+    words = set()
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                word, _, score = line.strip().partition(";")
+                try:
+                    if score and int(score) < 50: continue
+                except ValueError: pass
+                word = re.sub(r"[^A-Z]", "", word.upper())
+                if word: words.add(word)
+    except OSError: return None
+    return words
+
+def _init_analyzer(wordlist_path):
+    global _analyzer_words
+    _analyzer_words = load_wordlist(wordlist_path)
+
+def puzzle_metrics(puzzle, familiar=None):
+    # Structure metrics from the clue numbering; uses NumPy for the grid arrays when available
+    try: import numpy as np
+    except ImportError: np = None
+    w, n = puzzle.width, puzzle.width * puzzle.height
+    entries = [(cell, len(answer), 1 if d == 'across' else w, answer) for d, num, cell, clue, answer in iter_entries(puzzle)]
+    lengths = [length for cell, length, step, answer in entries]
+    if np is not None:
+        coverage = np.zeros(n, dtype=np.int16)
+        for cell, length, step, answer in entries: coverage[cell:cell + length * step:step] += 1
+        white = np.frombuffer(puzzle.solution.encode('latin-1', 'replace'), dtype=np.uint8) != ord('.')
+        blocks = n - int(np.count_nonzero(white))
+        unchecked = int(np.count_nonzero(white & (coverage < 2)))
+        lengths = np.array(lengths, dtype=np.int32)
+        words, total, short = len(lengths), int(lengths.sum()), int(np.count_nonzero(lengths == 3))
+    else:
+        coverage = [0] * n
+        for cell, length, step, answer in entries:
+            for i in range(cell, cell + length * step, step): coverage[i] += 1
+        blocks = puzzle.solution.count('.')
+        unchecked = sum(1 for i, ch in enumerate(puzzle.solution) if ch != '.' and coverage[i] < 2)
+        words, total, short = len(lengths), sum(lengths), lengths.count(3)
+    metrics = {"words": words, "avg_len": round(total / words, 2) if words else 0,
+               "blocks": round(100 * blocks / n, 1) if n else 0, "unchecked": unchecked,
+               "short": round(100 * short / words, 1) if words else 0, "familiarity": None}
+    if familiar is not None and words:
+        metrics["familiarity"] = round(100 * sum(1 for e in entries if e[3].upper() in familiar) / words, 1)
+    return metrics
+
+def _analyze_puz_file(path):
+    # Runs in a worker process, like _index_puz_file
+    try:
+        mtime = puzzle_mtime(path)
+        metrics = puzzle_metrics(read_puzzle(path), _analyzer_words)
+        metrics["mtime"] = mtime
+        return path, metrics
+    except Exception:
+        return path, None
+
+def _thumbnail_layout(path):
+    # Runs in a worker process: [mtime, width, height, block mask as hex] for the thumbnail cache.
+    # Unreadable files get an empty layout so they aren't retried until they change.
+    mtime = None
+    try:
+        mtime = puzzle_mtime(path)
+        puzzle = read_puzzle(path)
+        mask = "".join('1' if ch == '.' else '0' for ch in puzzle.solution)
+        return path, [mtime, puzzle.width, puzzle.height, "%x" % int("1" + mask, 2)]
+    except Exception:
+        return path, [mtime, 0, 0, ""]
+
+def make_synthetic_puzzle(width, height, seed=0, block_ratio=0.15):
+    # Random but valid grid with numbered clues; used by the benchmarks and soak tests
+    import puz
+    import random
+    rnd = random.Random(seed)
+    p = puz.Puzzle()
+    p.width, p.height = width, height
+    p.solution = "".join('.' if rnd.random() < block_ratio else rnd.choice("ABCDEFGHIJKLMNOPRSTUVWY") for _ in range(width * height))
+    p.fill = "".join('.' if ch == '.' else '-' for ch in p.solution)
+    across, down = puz.get_grid_numbering(p.solution, width, height)
+    p.clues = [f"Synthetic clue {i}" for i in range(len(across) + len(down))]
+    p.title = f"Synthetic {width}x{height} #{seed}"
+    return p
+
+class LibraryIndex:
+    # Inverted index over clue text and answers of every .puz below a folder.
+    # On disk: per-file entries keyed by path + mtime, plus the token/answer postings.
+    def __init__(self, index_file=LIBRARY_INDEX_FILE):
+        self.index_file = index_file
+        self.files = {}
+        self.entries = []
+        self.clue_index = {}
+        self.answer_index = {}
+        self.suggest_cache = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.index_file, 'r') as f: data = json.load(f)
+        except: return
+        if data.get("version") != LIBRARY_INDEX_VERSION: return
+        self.files = data.get("files", {})
+        self.flatten()
+        self.clue_index = data.get("clue_index", {})
+        self.answer_index = data.get("answer_index", {})
+
+    def save(self):
+        data = {"version": LIBRARY_INDEX_VERSION, "files": self.files,
+                "clue_index": self.clue_index, "answer_index": self.answer_index}
+        try:
+            with open(self.index_file, 'w') as f: json.dump(data, f, separators=(',', ':'))
+        except: pass
+
+    def copy(self):
+        # Working copy for a rebuild, so readers keep a consistent index until it is swapped in.
+        # Postings and entries are replaced on rebuild, never changed in place, so they can be shared.
+        other = LibraryIndex.__new__(LibraryIndex)
+        other.index_file = self.index_file
+        other.files = dict(self.files)
+        other.entries, other.clue_index, other.answer_index = self.entries, self.clue_index, self.answer_index
+        other.suggest_cache = {}
+        return other
+
+    def flatten(self):
+        entries = []
+        for path in sorted(self.files):
+            for d, num, clue, answer in self.files[path]["entries"]:
+                entries.append((path, d, num, clue, answer))
+        self.entries = entries
+
+    def rebuild_postings(self):
+        self.flatten()
+        clue_index, answer_index = {}, {}
+        for entry_id, (path, d, num, clue, answer) in enumerate(self.entries):
+            for tok in clue_tokens(clue):
+                clue_index.setdefault(tok, []).append(entry_id)
+            answer_index.setdefault(answer.upper(), []).append(entry_id)
+        self.clue_index, self.answer_index = clue_index, answer_index
+        self.suggest_cache = {}
+
+    def update(self, folder, workers=None):
+        # Re-parses only files whose mtime changed; returns the number of files touched.
+        # folder is the whole library, so files outside it (an earlier library folder) are dropped too.
+        found = find_puzzles(folder)
+        removed = [p for p in self.files if p not in found]
+        stale = [p for p, m in found.items() if p not in self.files or self.files[p]["mtime"] != m]
+        for p in removed: del self.files[p]
+
+        if len(stale) < 8:
+            self.apply_results(map(_index_puz_file, stale))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                self.apply_results(ex.map(_index_puz_file, stale, chunksize=32))
+
+        if removed or stale:
+            self.rebuild_postings()
+            self.save()
+        return len(removed) + len(stale)
+
+    def apply_results(self, results):
+        for path, mtime, entries in results:
+            if entries is None: self.files.pop(path, None)
+            else: self.files[path] = {"mtime": mtime, "entries": entries}
+
+    def search(self, query, limit=500):
+        # Plain words match clue text (all must appear); "=WORD" matches an answer exactly
+        postings = []
+        for term in query.split():
+            if term.startswith("="):
+                postings.append(self.answer_index.get(term[1:].upper(), []))
+            else:
+                for tok in clue_tokens(term):
+                    postings.append(self.clue_index.get(tok, []))
+        if not postings: return []
+        postings.sort(key=len)
+        hits = set(postings[0])
+        for plist in postings[1:]:
+            if not hits: break
+            hits.intersection_update(plist)
+        return [self.entries[i] for i in sorted(hits)[:limit]]
+
+    def rank_answers(self, clue, exclude_path=""):
+        # Answers of prior clues sharing tokens with this one, scored by IDF-weighted overlap.
+        # Cached per clue so cursor moves inside the same entry only re-run the pattern filter.
+        key = (clue, exclude_path)
+        if key in self.suggest_cache: return self.suggest_cache[key]
+        n = len(self.entries)
+        toks = clue_tokens(clue)
+        weights = {}
+        for tok in toks:
+            plist = self.clue_index.get(tok)
+            if plist: weights[tok] = math.log(1 + n / len(plist))
+        total = sum(weights.values()) or 1.0
+        scores = {}
+        # Very common tokens are skipped when rarer ones exist; they add little but cost the most
+        cap = max(1000, n // 20)
+        common = [t for t in weights if len(self.clue_index[t]) > cap]
+        for tok, w in weights.items():
+            if tok in common and len(common) < len(weights): continue
+            for i in self.clue_index[tok]:
+                scores[i] = scores.get(i, 0.0) + w
+        ranked = {}
+        for i, score in scores.items():
+            path, d, num, prior_clue, answer = self.entries[i]
+            if path == exclude_path: continue
+            score = score / total
+            if score > ranked.get(answer, 0.0): ranked[answer] = score
+        result = sorted(ranked.items(), key=lambda kv: -kv[1])
+        if len(self.suggest_cache) > 256: self.suggest_cache.clear()
+        self.suggest_cache[key] = result
+        return result
+
+    def suggest(self, clue, pattern, exclude_path="", limit=8, min_score=0.3):
+        # pattern uses '-' for unknown cells, e.g. "O-E-"
+        out = []
+        for answer, score in self.rank_answers(clue, exclude_path):
+            if score < min_score: break
+            if len(answer) != len(pattern): continue
+            if all(p == '-' or p == a for p, a in zip(pattern, answer)):
+                out.append(answer)
+                if len(out) >= limit: break
+        return out
+
+class LibraryStats:
+    # Per-puzzle metrics keyed by absolute path, kept current by mtime like LibraryIndex.
+    # Results are written out every save_every files, so an interrupted run picks up where it stopped.
+    def __init__(self, stats_file=LIBRARY_STATS_FILE, wordlist_file=WORDLIST_FILE):
+        self.stats_file = stats_file
+        self.wordlist_file = wordlist_file
+        self.files = {}
+        self.wordlist_mtime = None
+        try:
+            with open(self.stats_file, 'r') as f: data = json.load(f)
+            if data.get("version") == 1:
+                self.files = data.get("files", {})
+                self.wordlist_mtime = data.get("wordlist_mtime")
+        except: pass
+
+    def save(self):
+        data = {"version": 1, "wordlist_mtime": self.wordlist_mtime, "files": self.files}
+        try:
+            with open(self.stats_file, 'w') as f: json.dump(data, f, separators=(',', ':'))
+        except: pass
+
+    def copy(self):
+        # Working copy for an update, like LibraryIndex.copy(); per-file metrics are replaced, never changed in place
+        other = LibraryStats.__new__(LibraryStats)
+        other.stats_file, other.wordlist_file = self.stats_file, self.wordlist_file
+        other.files = dict(self.files)
+        other.wordlist_mtime = self.wordlist_mtime
+        return other
+
+    def get(self, path):
+        return self.files.get(os.path.abspath(path))
+
+    def stale(self, paths):
+        # A new or edited wordlist changes every familiarity score
+        try: wordlist_mtime = os.path.getmtime(self.wordlist_file)
+        except OSError: wordlist_mtime = None
+        if wordlist_mtime != self.wordlist_mtime:
+            self.files = {}
+            self.wordlist_mtime = wordlist_mtime
+        out = []
+        for p in paths:
+            p = os.path.abspath(p)
+            try: mtime = puzzle_mtime(p)
+            except OSError: continue
+            if p not in self.files or self.files[p]["mtime"] != mtime: out.append(p)
+        return out
+
+    def update(self, paths, workers=None, save_every=500, progress=None):
+        # Analyzes the paths that are new or changed; returns how many were analyzed
+        stale = self.stale(paths)
+        if not stale: return 0
+        wordlist = os.path.abspath(self.wordlist_file)
+        done = 0
+        def collect(results):
+            nonlocal done
+            for path, metrics in results:
+                if metrics is None: self.files.pop(path, None)
+                else: self.files[path] = metrics
+                done += 1
+                if done % save_every == 0:
+                    self.save()
+                    if progress: progress(done, len(stale))
+        if len(stale) < 8:
+            _init_analyzer(wordlist)
+            collect(map(_analyze_puz_file, stale))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_analyzer, initargs=(wordlist,)) as ex:
+                collect(ex.map(_analyze_puz_file, stale, chunksize=32))
+        self.save()
+        if progress: progress(done, len(stale))
+        return done
+
+def analyze_library(folder, workers=None):
+    stats = LibraryStats()
+    paths = sorted(find_puzzles(folder))
+    t0 = time.perf_counter()
+    n = stats.update(paths, workers, progress=lambda done, total: print(f"{done}/{total} analyzed", flush=True))
+    print(f"analyzed {n} of {len(paths)} puzzles in {time.perf_counter() - t0:.1f}s "
+          f"({'with' if stats.wordlist_mtime is not None else 'no'} wordlist)")
+    rows = [stats.get(p) for p in paths]
+    rows = [r for r in rows if r]
+    print(f"{'metric':>11} {'min':>8} {'median':>8} {'max':>8}")
+    for key, label, fmt in LIBRARY_METRICS:
+        values = sorted(r[key] for r in rows if r.get(key) is not None)
+        if values: print(f"{label:>11} {values[0]:8.1f} {values[len(values) // 2]:8.1f} {values[-1]:8.1f}")
+    return stats
+
+class SaveStore:
+    # Saved grids live packed (one byte per cell) in an append-only data file.
+    # Only a path -> [offset, length, crc32] index is kept in memory, plus a small LRU
+    # of recently touched grids. The legacy saves.json is imported once on first use.
+    # The index file names the data file it belongs to and is only ever replaced whole, so a
+    # crash leaves either the old index with the old data file or the new one with the new.
+    def __init__(self, data_file="saves.dat", index_file="saves_index.json", legacy_file="saves.json", cache_size=16):
+        self.base_data_file = data_file
+        self.data_file = data_file
+        self.generation = 0
+        self.index_file = index_file
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.index = {}
+        self.dirty = False
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r') as f: data = json.load(f)
+                self.index = data["index"]
+                self.generation = data["generation"]
+                self.data_file = os.path.join(os.path.dirname(self.base_data_file), data["data"])
+            except: self.index = {}
+        elif os.path.exists(legacy_file):
+            self.import_legacy(legacy_file)
+
+    def import_legacy(self, legacy_file):
+        try:
+            with open(legacy_file, 'r') as f: legacy = json.load(f)
+        except: return
+        for path, grid in legacy.items():
+            if isinstance(grid, list): self.put(path, grid, flush=False)
+        self.flush()
+
+    def __contains__(self, path):
+        return path in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def pack(self, grid):
+        return "".join(grid).encode("utf-8")
+
+    def get(self, path):
+        if path not in self.index: return None
+        data = self.cache.get(path)
+        if data is None:
+            offset, length, crc = self.index[path]
+            try:
+                with open(self.data_file, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read(length)
+            except OSError: return None
+            if len(data) != length or zlib.crc32(data) != crc: return None
+        self.remember(path, data)
+        return list(data.decode("utf-8"))
+
+    def put(self, path, grid, flush=True):
+        # True once the grid is on disk and in the index there; callers keep their journal otherwise
+        data = self.pack(grid)
+        crc = zlib.crc32(data)
+        entry = self.index.get(path)
+        if entry and entry[1] == len(data) and entry[2] == crc:
+            self.remember(path, data)
+            return self.flush() if flush and self.dirty else True
+        try:
+            with open(self.data_file, 'ab') as f:
+                f.seek(0, os.SEEK_END)
+                offset = f.tell()
+                f.write(data)
+        except OSError: return False
+        self.index[path] = [offset, len(data), crc]
+        self.dirty = True
+        self.remember(path, data)
+        if not flush: return True
+        self.compact_if_needed()
+        return self.flush()
+
+    def remember(self, path, data):
+        self.cache[path] = data
+        self.cache.move_to_end(path)
+        while len(self.cache) > self.cache_size: self.cache.popitem(last=False)
+
+    def flush(self):
+        # Data reaches the disk before the index that points at it
+        try:
+            with open(self.data_file, 'ab') as f: os.fsync(f.fileno())
+            self.write_index(self.data_file, self.generation, self.index)
+        except: return False
+        self.dirty = False
+        return True
+
+    def write_index(self, data_file, generation, index):
+        tmp_file = self.index_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump({"data": os.path.basename(data_file), "generation": generation, "index": index}, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.index_file)
+
+    def compact_if_needed(self):
+        # Superseded records pile up in the data file; rewrite it once they outweigh live data
+        try: total = os.path.getsize(self.data_file)
+        except OSError: return
+        live = sum(length for offset, length, crc in self.index.values())
+        if total - live < max(live, 64 * 1024): return
+        # Live records go to a new data file; the old one stays valid until the index names the new one
+        generation = self.generation + 1
+        root, ext = os.path.splitext(self.base_data_file)
+        new_file = f"{root}.{generation}{ext}"
+        new_index = {}
+        try:
+            with open(self.data_file, 'rb') as src, open(new_file, 'wb') as dst:
+                for path, (offset, length, crc) in self.index.items():
+                    src.seek(offset)
+                    new_index[path] = [dst.tell(), length, crc]
+                    dst.write(src.read(length))
+                dst.flush()
+                os.fsync(dst.fileno())
+            self.write_index(new_file, generation, new_index)
+        except OSError: return
+        old_file = self.data_file
+        self.data_file, self.generation, self.index = new_file, generation, new_index
+        try: os.remove(old_file)
+        except OSError: pass
+
+# --- Dataset export ---
+# A library export is a folder of shards. part-NNNNN.jsonl holds one JSON record per puzzle;
+# part-NNNNN.idx holds the byte offset of each record plus the end of the file as little-endian
+# uint64, so a reader can mmap both and fetch record i without parsing the rest.
+# manifest.json lists the shards and their record counts.
+EXPORT_SHARD_RECORDS = 5000
+
+def _export_puz_file(job):
+    # Runs in a worker process. job is (path, saved grid location in saves.dat or None, saves.dat path);
+    # returns the encoded record, or None if the puzzle can't be read.
+    path, save_entry, data_file = job
+    try:
+        puzzle = read_puzzle(path)
+        numbering = puzzle.clue_numbering()
+        progress = None
+        if save_entry:
+            offset, length, crc = save_entry
+            with open(data_file, 'rb') as f:
+                f.seek(offset)
+                data = f.read(length)
+            if len(data) == length and zlib.crc32(data) == crc: progress = data.decode("utf-8")
+        record = {"path": path, "title": puzzle.title, "author": puzzle.author, "copyright": puzzle.copyright,
+                  "width": puzzle.width, "height": puzzle.height, "solution": puzzle.solution,
+                  "fill": puzzle.fill, "progress": progress,
+                  "entries": [[d, num, cell, clue, answer] for d, num, cell, clue, answer in iter_entries(puzzle, numbering)]}
+        return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n").encode("utf-8")
+    except Exception:
+        return None
+
+def export_dataset(folder, out_dir, workers=None, shard_records=EXPORT_SHARD_RECORDS, batch=256):
+    # Walks folder with a process pool and streams records into shards. Work is handed out one
+    # batch at a time, so at most one batch of records is held in memory whatever the library size.
+    # Progress comes from the saves in the current directory, matched on absolute path.
+    from array import array
+    from concurrent.futures import ProcessPoolExecutor
+    paths = sorted(find_puzzles(folder))
+    saves = SaveStore()
+    saved = {os.path.abspath(p): entry for p, entry in saves.index.items()}
+    data_file = os.path.abspath(saves.data_file)
+    os.makedirs(out_dir, exist_ok=True)
+
+    shards, out, offsets = [], None, None
+    def close_shard():
+        out.close()
+        with open(os.path.join(out_dir, shards[-1]["name"] + ".idx"), 'wb') as f:
+            offsets.append(shards[-1]["bytes"])
+            if sys.byteorder != "little": offsets.byteswap()
+            offsets.tofile(f)
+
+    skipped = 0
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        for start in range(0, len(paths), batch):
+            jobs = [(p, saved.get(p), data_file) for p in paths[start:start + batch]]
+            for line in ex.map(_export_puz_file, jobs, chunksize=16):
+                if line is None:
+                    skipped += 1
+                    continue
+                if out is None or shards[-1]["records"] >= shard_records:
+                    if out is not None: close_shard()
+                    shards.append({"name": f"part-{len(shards):05d}", "records": 0, "bytes": 0})
+                    out = open(os.path.join(out_dir, shards[-1]["name"] + ".jsonl"), 'wb')
+                    offsets = array('Q')
+                offsets.append(shards[-1]["bytes"])
+                out.write(line)
+                shards[-1]["records"] += 1
+                shards[-1]["bytes"] += len(line)
+    if out is not None: close_shard()
+
+    with open(os.path.join(out_dir, "manifest.json"), 'w') as f:
+        json.dump({"version": 1, "source": os.path.abspath(folder), "records": sum(sh["records"] for sh in shards),
+                   "shards": shards}, f, indent=1)
+    print(f"exported {sum(sh['records'] for sh in shards)} puzzles into {len(shards)} shards "
+          f"({skipped} unreadable) in {time.perf_counter() - t0:.1f}s")
+    return len(paths) - skipped
+
+class ExportDataset:
+    # Random access to an export without loading it: shards and offset tables are memory-mapped
+    # and only the requested record is decoded.
+    def __init__(self, out_dir):
+        import mmap
+        with open(os.path.join(out_dir, "manifest.json")) as f: self.manifest = json.load(f)
+        self.shards, self.starts = [], []
+        total = 0
+        for shard in self.manifest["shards"]:
+            maps = []
+            for ext in (".jsonl", ".idx"):
+                with open(os.path.join(out_dir, shard["name"] + ext), 'rb') as f:
+                    maps.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            self.shards.append(maps)
+            self.starts.append(total)
+            total += shard["records"]
+        self.total = total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, i):
+        if i < 0: i += self.total
+        if not 0 <= i < self.total: raise IndexError(i)
+        shard = bisect.bisect_right(self.starts, i) - 1
+        data, idx = self.shards[shard]
+        begin, end = struct.unpack_from("<QQ", idx, (i - self.starts[shard]) * 8)
+        return json.loads(data[begin:end])
+
+    def __iter__(self):
+        for data, idx in self.shards:
+            pos = 0
+            while pos < len(data):
+                end = data.find(b"\n", pos) + 1 or len(data)
+                yield json.loads(data[pos:end])
+                pos = end
+
+    def close(self):
+        for maps in self.shards:
+            for m in maps: m.close()
+        self.shards = []
+
+class FolderWatcher:
+    # Reports .puz files appearing in / vanishing from one folder as ("add"|"remove", folder, name)
+    # tuples on a queue. Uses inotify through ctypes on Linux and falls back to polling the
+    # directory mtime elsewhere, re-listing only when it changed. ("rescan", folder, None) means
+    # events were lost and the caller should re-list.
+    IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x40, 0x80, 0x100, 0x200
+    IN_DELETE_SELF, IN_MOVE_SELF, IN_Q_OVERFLOW, IN_IGNORED = 0x400, 0x800, 0x4000, 0x8000
+
+    def __init__(self, folder, events, suffixes=('.puz',), poll_interval=1.0):
+        self.folder = folder or "."
+        self.events = events
+        self.suffixes = suffixes
+        self.poll_interval = poll_interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def wanted(self, name):
+        return name.lower().endswith(self.suffixes)
+
+    def run(self):
+        fd = None
+        try: fd = self.open_inotify()
+        except Exception: fd = None
+        if fd is None:
+            self.poll()
+            return
+        try: self.read_inotify(fd)
+        finally: os.close(fd)
+
+    def open_inotify(self):
+        if not sys.platform.startswith("linux"): return None
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0: return None
+        mask = self.IN_CREATE | self.IN_DELETE | self.IN_MOVED_FROM | self.IN_MOVED_TO | self.IN_DELETE_SELF | self.IN_MOVE_SELF
+        if libc.inotify_add_watch(fd, os.fsencode(self.folder), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def read_inotify(self, fd):
+        header = struct.Struct("iIII")
+        while not self.stopped.is_set():
+            ready, _, _ = select.select([fd], [], [], 0.5)
+            if not ready: continue
+            try: data = os.read(fd, 64 * 1024)
+            except BlockingIOError: continue
+            offset = 0
+            while offset + header.size <= len(data):
+                wd, mask, cookie, length = header.unpack_from(data, offset)
+                name = os.fsdecode(data[offset + header.size:offset + header.size + length].rstrip(b"\0"))
+                offset += header.size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    self.events.put(("rescan", self.folder, None))
+                elif mask & (self.IN_IGNORED | self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                    self.events.put(("rescan", self.folder, None))
+                    return
+                elif name and self.wanted(name):
+                    kind = "add" if mask & (self.IN_CREATE | self.IN_MOVED_TO) else "remove"
+                    self.events.put((kind, self.folder, name))
+
+    def poll(self):
+        def listing():
+            try: return {f for f in os.listdir(self.folder) if self.wanted(f)}
+            except OSError: return set()
+        def dir_mtime():
+            try: return os.stat(self.folder).st_mtime_ns
+            except OSError: return None
+        names, mtime = listing(), dir_mtime()
+        while not self.stopped.wait(self.poll_interval):
+            new_mtime = dir_mtime()
+            if new_mtime == mtime: continue
+            mtime = new_mtime
+            new_names = listing()
+            for name in new_names - names: self.events.put(("add", self.folder, name))
+            for name in names - new_names: self.events.put(("remove", self.folder, name))
+            names = new_names
+
+# --- Co-op solving ---
+# Newline-delimited JSON over TCP. Client -> server: {"t": "join", "room", "name", "size"} and
+# {"t": "d", "d": [[cell, letter, seq], ...]}. Server -> client: {"t": "snap", "you": client id,
+# "cells": [[cell, letter], ...]} once after joining, then {"t": "d", "d": [[cell, letter, author, seq], ...]}
+# in the order the server applied them, which makes the last writer per cell win on every client.
+# The author is the server-assigned client id; names are only for display and need not be unique.
+# Snapshots and batches are split into lines of at most COOP_CHUNK entries, which keeps every line
+# well under asyncio's 64 KiB readline limit on any grid size; all but the last snap line carry "more".
+def coop_encode(msg):
+    return (json.dumps(msg, separators=(',', ':')) + "\n").encode("utf-8")
+
+def coop_encode_deltas(deltas):
+    return b"".join(coop_encode({"t": "d", "d": deltas[i:i + COOP_CHUNK]}) for i in range(0, len(deltas), COOP_CHUNK))
+
+def coop_encode_snapshot(client_id, cells):
+    chunks = [cells[i:i + COOP_CHUNK] for i in range(0, len(cells), COOP_CHUNK)] or [[]]
+    lines = []
+    for n, chunk in enumerate(chunks):
+        msg = {"t": "snap", "you": client_id, "cells": chunk}
+        if n < len(chunks) - 1: msg["more"] = True
+        lines.append(coop_encode(msg))
+    return b"".join(lines)
+
+class CoopRoom:
+    def __init__(self, loop, size):
+        self.loop = loop
+        self.size = size
+        self.cells = {}
+        self.members = set()
+        self.outbox = []
+        self.flush_scheduled = False
+
+    def apply(self, author, deltas):
+        for delta in deltas:
+            try: idx, letter, seq = int(delta[0]), str(delta[1]), int(delta[2])
+            except (TypeError, ValueError, IndexError): continue
+            if not (0 <= idx < self.size) or len(letter) != 1: continue
+            if letter == '-': self.cells.pop(idx, None)
+            else: self.cells[idx] = letter
+            self.outbox.append([idx, letter, author, seq])
+        if self.outbox and not self.flush_scheduled:
+            # Everything applied during this event-loop tick goes out as one message
+            self.flush_scheduled = True
+            self.loop.call_soon(self.flush)
+
+    def flush(self):
+        self.flush_scheduled = False
+        if not self.outbox: return
+        data = coop_encode_deltas(self.outbox)
+        self.outbox = []
+        for writer in list(self.members):
+            if writer.transport.get_write_buffer_size() > COOP_MAX_BUFFER:
+                # A client this far behind would only delay everyone else; it can rejoin for a snapshot
+                self.members.discard(writer)
+                writer.close()
+            else:
+                writer.write(data)
+
+class CoopServer:
+    def __init__(self):
+        self.rooms = {}
+        self.next_client = 0
+
+    async def handle(self, reader, writer):
+        import asyncio
+        room, room_id, name, client_id = None, None, "?", None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                try: msg = json.loads(line)
+                except ValueError: continue
+                kind = msg.get("t")
+                if kind == "join" and room is None:
+                    room_id, name = str(msg.get("room")), str(msg.get("name", "?"))[:32]
+                    room = self.rooms.get(room_id)
+                    if room is None:
+                        room = self.rooms[room_id] = CoopRoom(asyncio.get_running_loop(), int(msg.get("size", 0)))
+                    self.next_client += 1
+                    client_id = self.next_client
+                    writer.write(coop_encode_snapshot(client_id, [[i, ch] for i, ch in room.cells.items()]))
+                    room.members.add(writer)
+                elif kind == "d" and room is not None:
+                    room.apply(client_id, msg.get("d", []))
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            if room is not None:
+                room.members.discard(writer)
+                if not room.members: self.rooms.pop(room_id, None)
+            writer.close()
+
+    async def serve(self, host, port):
+        import asyncio
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"co-op server listening on {host}:{port}", flush=True)
+        async with server: await server.serve_forever()
+
+class CoopClient:
+    # Runs its own asyncio loop on a worker thread. send() may be called from the Tk thread;
+    # incoming messages are put on the given queue for the Tk side to apply.
+    def __init__(self, host, port, room, name, size, incoming):
+        self.host, self.port = host, port
+        self.room, self.name, self.size = room, name, size
+        self.incoming = incoming
+        self.loop = None
+        self.writer = None
+        self.outbox = []
+        self.flush_scheduled = False
+        self.seq = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        import asyncio
+        try: asyncio.run(self.main())
+        except Exception as e: self.incoming.put({"t": "error", "error": str(e)})
+        self.incoming.put({"t": "closed"})
+
+    async def main(self):
+        import asyncio
+        reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(coop_encode({"t": "join", "room": self.room, "name": self.name, "size": self.size}))
+        with self.lock:
+            # Edits made while connecting were parked in outbox; send them right after the join
+            self.loop = asyncio.get_running_loop()
+            if self.outbox: self.flush()
+        snapshot = None
+        while True:
+            line = await reader.readline()
+            if not line: break
+            try: msg = json.loads(line)
+            except ValueError: continue
+            if msg.get("t") == "snap":
+                # A chunked snapshot reaches the app whole
+                if snapshot is not None: msg["cells"] = snapshot + msg.get("cells", [])
+                snapshot = msg["cells"] if msg.get("more") else None
+                if snapshot is not None: continue
+            self.incoming.put(msg)
+
+    def send(self, idx, letter):
+        self.seq += 1
+        with self.lock:
+            if self.loop is None: self.outbox.append([idx, letter, self.seq])
+            else: self.loop.call_soon_threadsafe(self.queue_delta, [idx, letter, self.seq])
+        return self.seq
+
+    def queue_delta(self, delta):
+        self.outbox.append(delta)
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.loop.call_soon(self.flush)
+
+    def flush(self):
+        self.flush_scheduled = False
+        if self.outbox and not self.writer.is_closing():
+            self.writer.write(coop_encode_deltas(self.outbox))
+        self.outbox = []
+
+    def close(self):
+        if self.loop is not None and self.writer is not None:
+            self.loop.call_soon_threadsafe(self.writer.close)
+
+def parse_host_port(text, default_host="localhost"):
+    host, _, port = text.rpartition(":")
+    return host or default_host, int(port or COOP_DEFAULT_PORT)
+
+async def coop_load_test(host, port, rooms=50, typists=200, duration=10.0, rate=5.0, size=225):
+    # Simulated typists each join one of `rooms` rooms and send single-cell edits at `rate`/s.
+    # Latency is measured from sending an edit until its broadcast comes back to the sender.
+    import asyncio
+    import random
+    import statistics
+    latencies = []
+    errors = []
+
+    async def typist(n):
+        rnd = random.Random(n)
+        name = f"typist{n}"
+        sent = {}
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError as e:
+            errors.append(str(e))
+            return
+        writer.write(coop_encode({"t": "join", "room": f"load-{n % rooms}", "name": name, "size": size}))
+        me = json.loads(await reader.readline()).get("you")
+        stop_at = time.perf_counter() + duration
+
+        async def receive():
+            while True:
+                line = await reader.readline()
+                if not line: return
+                for idx, letter, author, seq in json.loads(line).get("d", []):
+                    if author == me and seq in sent:
+                        latencies.append(time.perf_counter() - sent.pop(seq))
+
+        receiver = asyncio.ensure_future(receive())
+        seq = 0
+        while time.perf_counter() < stop_at:
+            seq += 1
+            sent[seq] = time.perf_counter()
+            writer.write(coop_encode({"t": "d", "d": [[rnd.randrange(size), rnd.choice("ABCDE-"), seq]]}))
+            await asyncio.sleep(rnd.expovariate(rate))
+        await asyncio.sleep(0.5)
+        receiver.cancel()
+        writer.close()
+
+    await asyncio.gather(*(typist(n) for n in range(typists)))
+    if errors: print(f"{len(errors)} connections failed: {errors[0]}")
+    if not latencies:
+        print("no edits were echoed back")
+        return
+    latencies.sort()
+    def pct(p): return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    print(f"{typists} typists in {rooms} rooms, {len(latencies)} edits in {duration:.0f}s "
+          f"({len(latencies) / duration:.0f}/s)")
+    print(f"latency ms: p50 {pct(0.5):.2f}  p95 {pct(0.95):.2f}  p99 {pct(0.99):.2f}  max {latencies[-1]*1000:.2f}  "
+          f"mean {statistics.mean(latencies)*1000:.2f}")
+
+class SessionRecorder:
+    # JSON-lines log of the input events that reach the app's handlers. The first line holds the
+    # settings and puzzle state at the start, the last one the final grid; each line in between is
+    # [seconds since start, kind, ...fields]. replay_session() feeds a log back into a fresh app.
+    def __init__(self, path, app):
+        self.path = path
+        # Line-buffered, so a crash or kill loses at most the event being written
+        self.f = open(path, 'w', buffering=1)
+        self.t0 = time.perf_counter()
+        self.write({"v": 1, "file": os.path.abspath(app.current_file_path), "grid": "".join(app.user_grid),
+                    "cursor": [app.cursor_col, app.cursor_row], "direction": app.direction,
+                    "history": {"undo": list(app.history.undo), "redo": app.history.redo},
+                    "settings": {"error_check": app.var_error_check.get(), "skip_filled": app.var_skip_filled.get(),
+                                 "end_behavior": app.var_end_behavior.get(), "ctrl_mode": app.var_ctrl_mode.get(),
+                                 "cell_size": app.cell_size}})
+
+    def write(self, record):
+        self.f.write(json.dumps(record, separators=(',', ':')) + "\n")
+
+    def log(self, kind, *fields):
+        self.write([round(time.perf_counter() - self.t0, 4), kind] + list(fields))
+
+    def close(self, app):
+        self.write({"end": round(time.perf_counter() - self.t0, 4), "file": os.path.abspath(app.current_file_path),
+                    "grid": "".join(app.user_grid)})
+        self.f.close()
+
+class EditHistory:
+    # Undo/redo for one puzzle as (cell, old, new) deltas. A bulk action is one group, so a whole
+    # reveal or reset comes back in one step; past UNDO_LIMIT the oldest groups fall off.
+    def __init__(self, limit=UNDO_LIMIT):
+        self.undo = deque(maxlen=limit)
+        self.redo = []
+        self.group = None
+        self.depth = 0
+
+    def begin(self):
+        if self.depth == 0: self.group = []
+        self.depth += 1
+
+    def end(self):
+        self.depth -= 1
+        if self.depth == 0:
+            group, self.group = self.group, None
+            if group: self.push(group)
+
+    def record(self, idx, old, new):
+        if self.group is not None: self.group.append((idx, old, new))
+        else: self.push([(idx, old, new)])
+
+    def push(self, group):
+        self.undo.append(group)
+        self.redo.clear()
+
+class ProgressJournal:
+    # Write-ahead log of one puzzle's edits: a header line with the puzzle path, a snapshot line,
+    # then one "cell char" line per edit. Every JOURNAL_COMPACT edits it is rewritten as a fresh
+    # snapshot. It is deleted once the grid is in the save store, so a journal found on load
+    # means the app stopped without saving and holds the progress that was lost.
+    def __init__(self, path, directory=JOURNAL_DIR):
+        self.path = os.path.abspath(path)
+        self.directory = directory
+        self.file = os.path.join(directory, "%08x.log" % zlib.crc32(self.path.encode("utf-8")))
+        self.f = None
+        self.deltas = 0
+
+    def recover(self, size):
+        # The grid the journal describes, or None if there is no usable journal for this puzzle
+        try:
+            with open(self.file, 'r', encoding='utf-8', errors='replace', newline='\n') as f: lines = f.read().split("\n")
+        except OSError: return None
+        if len(lines) < 3 or lines[0] != "P " + self.path or not lines[1].startswith("S "): return None
+        grid = list(lines[1][2:])
+        if len(grid) != size: return None
+        # The last piece is "" for a clean file, or an edit cut off mid-write
+        for line in lines[2:-1]:
+            idx, sep, ch = line.partition(" ")
+            if sep and len(ch) == 1 and idx.isdigit() and int(idx) < size: grid[int(idx)] = ch
+        return grid
+
+    def log(self, idx, ch, grid):
+        try:
+            if self.f is None or self.deltas >= JOURNAL_COMPACT:
+                self.snapshot(grid)
+                return
+            self.f.write(f"{idx} {ch}\n")
+            self.f.flush()
+            self.deltas += 1
+        except (OSError, ValueError): pass
+
+    def snapshot(self, grid):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_file = self.file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(f"P {self.path}\nS {''.join(grid)}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.close()
+        os.replace(tmp_file, self.file)
+        self.f = open(self.file, 'a', encoding='utf-8', newline='\n')
+        self.deltas = 0
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def discard(self):
+        self.close()
+        self.deltas = 0
+        try: os.remove(self.file)
+        except OSError: pass
+
+class EntryIndex:
+    # Entries in Tab order (across, then down) with live bookkeeping of which entries still
+    # have wrong cells and which cells of each entry are empty. Kept current through update().
+    # dirty holds the entries that became filled or unfilled since the clue lists last caught up.
+    def __init__(self, clue_mapping, width, solution_grid, user_grid):
+        self.solution_grid = solution_grid
+        self.num_across = len(clue_mapping.across)
+        self.starts = []
+        self.cells = []
+        self.cell_entries = {'across': {}, 'down': {}}
+        for direction, clue_list in (('across', clue_mapping.across), ('down', clue_mapping.down)):
+            step = 1 if direction == 'across' else width
+            for clue in clue_list:
+                ordinal = len(self.cells)
+                cells = [clue['cell'] + i * step for i in range(clue['len'])]
+                for offset, idx in enumerate(cells): self.cell_entries[direction][idx] = (ordinal, offset)
+                self.starts.append(clue['cell'])
+                self.cells.append(cells)
+        self.rebuild(user_grid)
+
+    def rebuild(self, user_grid):
+        self.wrong = [sum(1 for idx in cells if user_grid[idx] != self.solution_grid[idx]) for cells in self.cells]
+        self.empty = [[off for off, idx in enumerate(cells) if user_grid[idx] in ['-', '.']] for cells in self.cells]
+        self.unsolved = [ordinal for ordinal, count in enumerate(self.wrong) if count]
+        self.dirty = set(range(len(self.cells)))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def update(self, idx, old, new):
+        sol = self.solution_grid[idx]
+        was_wrong, is_wrong = old != sol, new != sol
+        was_empty, is_empty = old in ['-', '.'], new in ['-', '.']
+        for direction in ('across', 'down'):
+            hit = self.cell_entries[direction].get(idx)
+            if hit is None: continue
+            ordinal, offset = hit
+            if was_wrong != is_wrong:
+                self.wrong[ordinal] += 1 if is_wrong else -1
+                if is_wrong and self.wrong[ordinal] == 1: bisect.insort(self.unsolved, ordinal)
+                elif not is_wrong and self.wrong[ordinal] == 0:
+                    del self.unsolved[bisect.bisect_left(self.unsolved, ordinal)]
+            if was_empty != is_empty:
+                empty = self.empty[ordinal]
+                if len(empty) == (0 if is_empty else 1): self.dirty.add(ordinal)
+                if is_empty: bisect.insort(empty, offset)
+                else: del empty[bisect.bisect_left(empty, offset)]
+
+    def direction_of(self, ordinal):
+        return 'across' if ordinal < self.num_across else 'down'
+
+    def entry_at(self, idx, direction):
+        hit = self.cell_entries[direction].get(idx)
+        return hit[0] if hit else None
+
+    def is_solved(self, ordinal):
+        return self.wrong[ordinal] == 0
+
+    def next_unsolved(self, ordinal, forward=True):
+        # First unsolved entry at or after (before, going back) ordinal, wrapping around
+        if not self.unsolved: return None
+        if forward:
+            i = bisect.bisect_left(self.unsolved, ordinal)
+            return self.unsolved[i] if i < len(self.unsolved) else self.unsolved[0]
+        i = bisect.bisect_right(self.unsolved, ordinal) - 1
+        return self.unsolved[i] if i >= 0 else self.unsolved[-1]
+
+    def first_empty(self, ordinal):
+        empty = self.empty[ordinal]
+        return self.cells[ordinal][empty[0]] if empty else None
+
+    def next_empty(self, idx, direction):
+        # Next empty cell after idx within its entry, or None if the rest of the entry is filled
+        hit = self.cell_entries[direction].get(idx)
+        if hit is None: return None
+        ordinal, offset = hit
+        empty = self.empty[ordinal]
+        i = bisect.bisect_right(empty, offset)
+        return self.cells[ordinal][empty[i]] if i < len(empty) else None
+
+class TileGridRenderer:
+    # Alternative grid backend: cell backgrounds are pre-rendered tiles blitted into a single
+    # PhotoImage, and only cells whose style changed since the last frame are touched.
+    # Tk cannot rasterize fonts into a PhotoImage without Pillow, so letters and clue numbers
+    # stay canvas text items, created and updated per changed cell rather than redrawn.
+    def __init__(self, app, canvas):
+        self.app = app
+        self.canvas = canvas
+        self.image = None
+        self.image_item = None
+        self.region = None
+        self.styles = {}
+        self.letters = {}
+        self.numbers = {}
+        self.tiles = {}
+
+    def tile(self, cs, bg):
+        key = (cs, bg)
+        tile = self.tiles.get(key)
+        if tile is None:
+            if len(self.tiles) > 64: self.tiles.clear()
+            tile = tk.PhotoImage(master=self.canvas, width=cs, height=cs)
+            tile.put(GRID_LINE_COLOR, to=(0, 0, cs, cs))
+            tile.put(bg, to=(1, 1, cs, cs))
+            self.tiles[key] = tile
+        return tile
+
+    def reset_region(self, cols, rows, cs):
+        # The image covers only the visible cells; a scroll or zoom starts a fresh frame
+        for item in list(self.letters.values()) + list(self.numbers.values()): self.canvas.delete(item)
+        self.letters, self.numbers, self.styles = {}, {}, {}
+        w, h = len(cols) * cs + 1, len(rows) * cs + 1
+        self.image = tk.PhotoImage(master=self.canvas, width=w, height=h)
+        self.image.put(GRID_LINE_COLOR, to=(0, 0, w, h))
+        x, y = cols.start * cs, rows.start * cs
+        if self.image_item is None:
+            self.image_item = self.canvas.create_image(x, y, anchor="nw", image=self.image)
+        else:
+            self.canvas.coords(self.image_item, x, y)
+            self.canvas.itemconfig(self.image_item, image=self.image)
+        self.canvas.tag_lower(self.image_item)
+        self.region = (cols.start, cols.stop, rows.start, rows.stop, cs)
+
+    def render(self, cols, rows):
+        app = self.app
+        cs = app.cell_size
+        if self.region != (cols.start, cols.stop, rows.start, rows.stop, cs):
+            self.reset_region(cols, rows, cs)
+        word_cells = app.current_word_cells()
+        for r in rows:
+            for c_idx in cols:
+                self.paint(app.get_index(c_idx, r), c_idx, r, word_cells)
+
+    def render_cells(self, cells):
+        # Repaints only the given cells that fall inside the current frame
+        app = self.app
+        if self.region is None or self.region[4] != app.cell_size: return
+        c0, c1, r0, r1, cs = self.region
+        word_cells = app.current_word_cells()
+        for idx in cells:
+            r, c_idx = divmod(idx, app.width)
+            if c0 <= c_idx < c1 and r0 <= r < r1: self.paint(idx, c_idx, r, word_cells)
+
+    def paint(self, idx, c_idx, r, word_cells):
+        app = self.app
+        cs = app.cell_size
+        num_color = app.c['grid_num']
+        style = app.cell_style(idx, c_idx, r, word_cells) + (num_color,)
+        if self.styles.get(idx) == style: return
+        old = self.styles.get(idx)
+        self.styles[idx] = style
+        bg_color, letter, text_color, num, _ = style
+        if old is None or old[0] != bg_color:
+            c0, r0 = self.region[0], self.region[2]
+            self.image.tk.call(str(self.image), "copy", str(self.tile(cs, bg_color)), "-to", (c_idx - c0) * cs, (r - r0) * cs)
+        x1, y1 = c_idx * cs, r * cs
+        fnt_num, fnt_char = app.grid_fonts()
+
+        if num is None:
+            if idx in self.numbers: self.canvas.delete(self.numbers.pop(idx))
+        elif idx in self.numbers:
+            self.canvas.itemconfig(self.numbers[idx], text=str(num), fill=num_color)
+        else:
+            self.numbers[idx] = self.canvas.create_text(x1+2, y1+1, anchor="nw", text=str(num), font=fnt_num, fill=num_color)
+
+        if letter is None:
+            if idx in self.letters: self.canvas.delete(self.letters.pop(idx))
+        elif idx in self.letters:
+            self.canvas.itemconfig(self.letters[idx], text=letter, fill=text_color)
+        else:
+            self.letters[idx] = self.canvas.create_text(x1 + cs/2, y1 + cs/2 + 2, text=letter, font=fnt_char, fill=text_color)
+
+class PuzzleSession:
+    # One open puzzle: parsed data, progress, cursor and its own prebuilt canvas and clue widgets.
+    # While a session is active these fields live on the app; they are copied back here on switch.
+    FIELDS = ('puzzle', 'width', 'height', 'solution_grid', 'user_grid', 'grid_numbers', 'clue_mapping',
+              'is_redacted', 'current_file_path', 'cursor_row', 'cursor_col', 'direction',
+              'highlighted_ref_indices', 'entry_index', 'history', 'journal', 'canvas', 'txt_across', 'txt_down')
+
+    def __init__(self, path):
+        self.path = path
+        self.render_key = None
+        for field in self.FIELDS: setattr(self, field, None)
+
+    def cells(self):
+        return (self.width or 0) * (self.height or 0)
 
 class CrosswordApp:
     def __init__(self, root):
@@ -22,6 +1327,10 @@ class CrosswordApp:
         self.user_grid = []     
         self.grid_numbers = {}  
         self.clue_mapping = None
+        self.entry_index = None
+        self.history = None
+        self.journal = None
+        self.history_applying = False
         self.is_redacted = False
         self.current_file_path = ""
         
@@ -32,9 +1341,15 @@ class CrosswordApp:
         self.favorites_file = "favorites.json"
         self.settings_file = "settings.json"
         self.saves_file = "saves.json"
+        self.saves_data_file = "saves.dat"
+        self.saves_index_file = "saves_index.json"
         
         self.favorites = self.load_json(self.favorites_file, [])
-        self.game_saves = self.load_json(self.saves_file, {})
+        # The saves index is read on a worker thread after the window is up; see start_deferred_load
+        self.game_saves = None
+        self.saves_loaded = False
+        self.opened_before_saves = set()
+        self.startup_times = {}
 
         # Navigation State
         self.cursor_col = 0
@@ -48,12 +1363,52 @@ class CrosswordApp:
         self.var_dark_theme = tk.BooleanVar(value=True)
         self.var_ctrl_mode = tk.StringVar(value="letter") 
         self.var_ctrl_reveal = tk.BooleanVar(value=True)
+        self.var_suggestions = tk.BooleanVar(value=False)
+        self.var_renderer = tk.StringVar(value="canvas")
+        self.var_thumbnails = tk.BooleanVar(value=True)
         
         # Visuals
         self.cell_size = 35 
         self.clue_font_size = 10 
         self.sidebar_visible = False
         self.last_opened_file = ""
+        self.library_folder = ""
+        self.library_index = None
+        self.library_waiters = None
+        self.sessions = OrderedDict()
+        self.sidebar_folder = None
+        self.sidebar_files = []
+        self.folder_watcher = None
+        self.watch_polling = False
+        self.watch_events = queue.Queue()
+        self.pending_sidebar = {}
+        self.pending_first = self.pending_last = 0.0
+        self.tile_renderers = {}
+        self.grid_font_cache = {}
+        self.recorder = None
+        self.thumb_layouts = None
+        self.thumb_images = OrderedDict()
+        self.thumb_pending = {}
+        self.thumb_results = queue.Queue()
+        self.thumb_pool = None
+        self.thumb_failures = {}
+        self.thumb_polling = False
+        self.thumb_dirty = False
+        self.sidebar_refresh_queued = False
+        self.library_stats = None
+        self.stats_running = False
+        self.stats_rerun = False
+        self.sidebar_sort = "name"
+        self.sidebar_descending = False
+        self.sidebar_column = None
+        self.coop = None
+        self.coop_path = None
+        self.coop_pending = {}
+        self.coop_applying = False
+        self.coop_events = queue.Queue()
+        self.coop_server = "localhost:%d" % COOP_DEFAULT_PORT
+        self.coop_name = ""
+        self.coop_id = None
         self.c = {} 
         
         self.load_settings()
@@ -63,12 +1418,23 @@ class CrosswordApp:
         
         file_menu = tk.Menu(menubar, tearoff=0)
         file_menu.add_command(label="Open .puz File", command=self.browse_file)
+        file_menu.add_command(label="Search Library...", command=self.open_library_search)
+        file_menu.add_command(label="Set Library Folder...", command=self.choose_library_folder)
+        file_menu.add_separator()
+        file_menu.add_command(label="Start Recording Session...", command=self.start_recording)
+        file_menu.add_command(label="Stop Recording Session", command=self.stop_recording, state=tk.DISABLED)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.on_close)
         menubar.add_cascade(label="File", menu=file_menu)
+        self.file_menu = file_menu
+
+        edit_menu = tk.Menu(menubar, tearoff=0)
+        edit_menu.add_command(label="Undo", accelerator="Alt+Backspace", command=self.undo_edit)
+        edit_menu.add_command(label="Redo", accelerator="Alt+Shift+Backspace", command=self.redo_edit)
+        menubar.add_cascade(label="Edit", menu=edit_menu)
         
         self.reveal_menu = tk.Menu(menubar, tearoff=0)
-        self.reveal_menu.add_command(label="Reveal Current Word", command=self.reveal_current_word)
+        self.reveal_menu.add_command(label="Reveal Current Word", command=self.menu_reveal_word)
         self.reveal_menu.add_command(label="Reveal Puzzle", command=self.reveal_puzzle)
         self.reveal_menu.add_separator()
         self.reveal_menu.add_command(label="Reset Puzzle (Clear All)", command=self.reset_puzzle)
@@ -82,17 +1448,31 @@ class CrosswordApp:
                                      variable=self.var_error_check, command=self.save_settings_trigger)
         options_menu.add_checkbutton(label="Skip Filled Squares", onvalue=True, offvalue=False, 
                                      variable=self.var_skip_filled, command=self.save_settings_trigger)
+        options_menu.add_checkbutton(label="Answer Suggestions", onvalue=True, offvalue=False,
+                                     variable=self.var_suggestions, command=self.toggle_suggestions)
+        options_menu.add_checkbutton(label="Sidebar Thumbnails", onvalue=True, offvalue=False,
+                                     variable=self.var_thumbnails, command=self.toggle_thumbnails)
         
         ctrl_menu = tk.Menu(options_menu, tearoff=0)
         ctrl_menu.add_radiobutton(label="Reveal Letter", value="letter", variable=self.var_ctrl_mode, command=self.save_settings)
         ctrl_menu.add_radiobutton(label="Reveal Word", value="word", variable=self.var_ctrl_mode, command=self.save_settings)
         options_menu.add_cascade(label="Ctrl Key Behavior", menu=ctrl_menu)
 
+        renderer_menu = tk.Menu(options_menu, tearoff=0)
+        renderer_menu.add_radiobutton(label="Canvas Items", value="canvas", variable=self.var_renderer, command=self.change_renderer)
+        renderer_menu.add_radiobutton(label="Tile Image", value="tiles", variable=self.var_renderer, command=self.change_renderer)
+        options_menu.add_cascade(label="Grid Renderer", menu=renderer_menu)
+
         options_menu.add_separator()
         options_menu.add_radiobutton(label="At end of word: Jump to Next", value="next", variable=self.var_end_behavior, command=self.save_settings)
         options_menu.add_radiobutton(label="At end of word: Stay", value="stay", variable=self.var_end_behavior, command=self.save_settings)
         
         menubar.add_cascade(label="Options", menu=options_menu)
+
+        self.coop_menu = tk.Menu(menubar, tearoff=0)
+        self.coop_menu.add_command(label="Join Co-op Session...", command=self.join_coop)
+        self.coop_menu.add_command(label="Leave Co-op Session", command=self.leave_coop, state=tk.DISABLED)
+        menubar.add_cascade(label="Co-op", menu=self.coop_menu)
         self.root.config(menu=menubar)
 
         # Top Toolbar
@@ -121,6 +1501,10 @@ class CrosswordApp:
         self.lbl_current_clue = tk.Label(self.top_frame, text="", font=("Helvetica", 12, "bold"), wraplength=500)
         self.lbl_current_clue.pack(side=tk.RIGHT, fill=tk.X, padx=15)
 
+        # Open puzzle tabs
+        self.tab_frame = tk.Frame(self.root)
+        self.tab_frame.pack(side=tk.TOP, fill=tk.X, padx=5)
+
         # Main Layout
         self.main_paned = tk.PanedWindow(self.root, orient=tk.HORIZONTAL, sashwidth=6)
         self.main_paned.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -129,9 +1513,30 @@ class CrosswordApp:
         self.sidebar_frame = tk.Frame(self.main_paned, relief=tk.SUNKEN, borderwidth=1, width=200)
         self.sidebar_label = tk.Label(self.sidebar_frame, text="Folder Content", font=("Arial", 9, "bold"))
         self.sidebar_label.pack(fill=tk.X, pady=2)
+        self.sidebar_header = tk.Frame(self.sidebar_frame)
+        self.sidebar_header.pack(fill=tk.X, padx=2)
+        self.btn_sort_name = tk.Button(self.sidebar_header, text="Name", font=("Arial", 8), relief=tk.FLAT,
+                                       borderwidth=0, command=lambda: self.set_sidebar_sort("name"))
+        self.btn_sort_name.pack(side=tk.LEFT)
+        self.btn_stats_column = tk.Menubutton(self.sidebar_header, text="Stats ▾", font=("Arial", 8), relief=tk.FLAT, borderwidth=0)
+        stats_menu = tk.Menu(self.btn_stats_column, tearoff=0)
+        for key, label, fmt in LIBRARY_METRICS:
+            stats_menu.add_command(label=label, command=lambda k=key: self.set_sidebar_sort(k))
+        stats_menu.add_separator()
+        stats_menu.add_command(label="Hide Column", command=lambda: self.set_sidebar_sort(None))
+        self.btn_stats_column.config(menu=stats_menu)
+        self.btn_stats_column.pack(side=tk.RIGHT)
         
-        self.file_listbox = tk.Listbox(self.sidebar_frame, font=("Arial", 9), borderwidth=0)
-        self.file_listbox.pack(expand=True, fill=tk.BOTH, padx=2, pady=2)
+        self.thumb_canvas = tk.Canvas(self.sidebar_frame, width=1, highlightthickness=0, borderwidth=0)
+        self.stats_canvas = tk.Canvas(self.sidebar_frame, width=1, highlightthickness=0, borderwidth=0)
+        self.file_listbox = tk.Listbox(self.sidebar_frame, font=("Arial", 9), borderwidth=0,
+                                       yscrollcommand=lambda first, last: self.schedule_sidebar_columns())
+        sidebar_font = font.Font(font=("Arial", 9))
+        self.thumb_size = max(8, sidebar_font.metrics("linespace"))
+        self.stats_width = sidebar_font.measure("000.0") + 4
+        if self.var_thumbnails.get(): self.thumb_canvas.pack(side=tk.LEFT, fill=tk.Y, padx=(2, 0), pady=2)
+        if self.sidebar_column: self.stats_canvas.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 2), pady=2)
+        self.file_listbox.pack(side=tk.LEFT, expand=True, fill=tk.BOTH, padx=2, pady=2)
         self.file_listbox.bind("<<ListboxSelect>>", self.on_file_select)
         
         self.context_menu = tk.Menu(self.root, tearoff=0)
@@ -146,46 +1551,39 @@ class CrosswordApp:
         self.game_paned = tk.PanedWindow(self.main_paned, orient=tk.HORIZONTAL, sashwidth=6)
         
         self.grid_frame = tk.Frame(self.game_paned)
-        self.canvas = tk.Canvas(self.grid_frame, highlightthickness=0)
-        self.canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.grid_vsb = tk.Scrollbar(self.grid_frame, orient=tk.VERTICAL, command=self.scroll_grid_y)
+        self.grid_hsb = tk.Scrollbar(self.grid_frame, orient=tk.HORIZONTAL, command=self.scroll_grid_x)
+        self.grid_refresh_pending = False
 
         self.clues_frame = tk.Frame(self.game_paned)
         
+        self.lbl_suggestions = tk.Label(self.clues_frame, text="", font=("Arial", 10, "italic"), anchor="w", justify=tk.LEFT, wraplength=350)
+        
         # Across
         self.lbl_across = tk.Label(self.clues_frame, text="Across", font=("Helvetica", 12, "bold"))
         self.lbl_across.pack(side=tk.TOP, anchor="w")
         
-        frame_across = tk.Frame(self.clues_frame)
-        frame_across.pack(side=tk.TOP, expand=True, fill=tk.BOTH, pady=(0, 10))
-        sb_across = tk.Scrollbar(frame_across)
-        sb_across.pack(side=tk.RIGHT, fill=tk.Y)
-        self.txt_across = tk.Text(frame_across, wrap=tk.WORD, state=tk.DISABLED, cursor="arrow", yscrollcommand=sb_across.set, height=10)
-        self.txt_across.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
-        sb_across.config(command=self.txt_across.yview)
+        self.frame_across = tk.Frame(self.clues_frame)
+        self.frame_across.pack(side=tk.TOP, expand=True, fill=tk.BOTH, pady=(0, 10))
+        self.sb_across = tk.Scrollbar(self.frame_across)
+        self.sb_across.pack(side=tk.RIGHT, fill=tk.Y)
 
         # Down
         self.lbl_down = tk.Label(self.clues_frame, text="Down", font=("Helvetica", 12, "bold"))
         self.lbl_down.pack(side=tk.TOP, anchor="w")
         
-        frame_down = tk.Frame(self.clues_frame)
-        frame_down.pack(side=tk.TOP, expand=True, fill=tk.BOTH)
-        sb_down = tk.Scrollbar(frame_down)
-        sb_down.pack(side=tk.RIGHT, fill=tk.Y)
-        self.txt_down = tk.Text(frame_down, wrap=tk.WORD, state=tk.DISABLED, cursor="arrow", yscrollcommand=sb_down.set, height=10)
-        self.txt_down.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
-        sb_down.config(command=self.txt_down.yview)
+        self.frame_down = tk.Frame(self.clues_frame)
+        self.frame_down.pack(side=tk.TOP, expand=True, fill=tk.BOTH)
+        self.sb_down = tk.Scrollbar(self.frame_down)
+        self.sb_down.pack(side=tk.RIGHT, fill=tk.Y)
 
-        # Tags
-        for txt in [self.txt_across, self.txt_down]:
-            txt.tag_config("highlight", background="#E1F5FE") 
-            txt.tag_config("default", background="white")
+        self.create_view_widgets()
 
         self.main_paned.add(self.game_paned)
         self.game_paned.add(self.grid_frame, minsize=400)
         self.game_paned.add(self.clues_frame, minsize=200)
 
         # Bindings
-        self.canvas.bind("<Button-1>", self.on_click)
         self.root.bind("<Key>", self.handle_keypress)
         
         self.root.bind("<Tab>", self.handle_tab)
@@ -193,11 +1591,321 @@ class CrosswordApp:
         
         self.root.bind("<Control_L>", self.handle_ctrl_key)
         self.root.bind("<Control_R>", self.handle_ctrl_key)
+        # Ctrl on its own reveals, so undo can't live on Ctrl+Z
+        self.root.bind("<Alt-BackSpace>", self.undo_edit)
+        self.root.bind("<Alt-Shift-BackSpace>", self.redo_edit)
         self.root.bind("<Button-1>", lambda e: self.canvas.focus_set())
 
         self.apply_theme()
-        if self.last_opened_file and os.path.exists(self.last_opened_file):
-            self.load_puz_file(self.last_opened_file)
+        if self.var_suggestions.get(): self.toggle_suggestions()
+        if self.last_opened_file:
+            self.lbl_filename.config(text="Loading...")
+            self.canvas.create_text(20, 20, anchor="nw", text=f"Loading {os.path.basename(self.last_opened_file)}...",
+                                    font=("Helvetica", 12, "italic"), fill=self.c['fg'], tags="placeholder")
+        self.startup_times["constructed"] = time.perf_counter() - STARTUP_T0
+        self.root.after_idle(self.start_deferred_load)
+
+    def create_view_widgets(self):
+        # Each open puzzle gets its own canvas and clue Text widgets so switching never re-renders
+        self.canvas = tk.Canvas(self.grid_frame, highlightthickness=0,
+                                xscrollcommand=self.grid_hsb.set, yscrollcommand=self.grid_vsb.set)
+        self.canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<Configure>", lambda e: self.schedule_grid_refresh())
+        self.canvas.bind("<MouseWheel>", self.on_grid_wheel)
+        self.canvas.bind("<Shift-MouseWheel>", self.on_grid_wheel)
+        self.canvas.bind("<Button-4>", self.on_grid_wheel)
+        self.canvas.bind("<Button-5>", self.on_grid_wheel)
+
+        self.txt_across = tk.Text(self.frame_across, wrap=tk.WORD, state=tk.DISABLED, cursor="arrow", yscrollcommand=self.sb_across.set, height=10)
+        self.txt_across.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.sb_across.config(command=self.txt_across.yview)
+
+        self.txt_down = tk.Text(self.frame_down, wrap=tk.WORD, state=tk.DISABLED, cursor="arrow", yscrollcommand=self.sb_down.set, height=10)
+        self.txt_down.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.sb_down.config(command=self.txt_down.yview)
+
+        # One click binding per widget; the clue is resolved from the tag under the pointer,
+        # so reloading clues never registers new Tcl commands
+        self.txt_across.bind("<Button-1>", lambda e: self.on_clue_click(e, 'across'))
+        self.txt_down.bind("<Button-1>", lambda e: self.on_clue_click(e, 'down'))
+
+        # Tags
+        for txt in [self.txt_across, self.txt_down]:
+            txt.tag_config("highlight", background="#E1F5FE") 
+            txt.tag_config("default", background="white")
+
+    # --- Open Puzzle Sessions ---
+    def render_key(self):
+        return (self.cell_size, self.clue_font_size, self.var_dark_theme.get(), self.var_error_check.get())
+
+    def stash_session(self):
+        session = self.sessions.get(self.current_file_path)
+        if session is None: return
+        for field in PuzzleSession.FIELDS: setattr(session, field, getattr(self, field))
+        session.render_key = self.render_key()
+        for widget in [self.canvas, self.txt_across, self.txt_down]: widget.pack_forget()
+
+    def show_session(self, session):
+        old_folder = os.path.dirname(self.current_file_path)
+        for field in PuzzleSession.FIELDS: setattr(self, field, getattr(session, field))
+        self.canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.txt_across.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.txt_down.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.sb_across.config(command=self.txt_across.yview)
+        self.sb_down.config(command=self.txt_down.yview)
+        self.lbl_filename.config(text=os.path.basename(self.current_file_path))
+        if os.path.dirname(self.current_file_path) != old_folder: self.show_in_sidebar(self.current_file_path)
+        else: self.select_in_sidebar()
+        if session.render_key != self.render_key(): self.apply_theme()
+        else: self.update_clue_display()
+        self.sessions.move_to_end(session.path)
+        self.update_tabs()
+        self.canvas.focus_set()
+
+    def switch_session(self, path):
+        if path == self.current_file_path or path not in self.sessions: return
+        if not self.confirm_leave_coop(): return
+        self.save_current_progress()
+        self.stash_session()
+        self.show_session(self.sessions[path])
+        self.save_settings()
+        self.log_file_switch()
+
+    def register_session(self):
+        path = self.current_file_path
+        if path not in self.sessions: self.sessions[path] = PuzzleSession(path)
+        self.sessions.move_to_end(path)
+        session = self.sessions[path]
+        session.width, session.height = self.width, self.height
+        self.evict_sessions()
+        self.update_tabs()
+
+    def evict_sessions(self):
+        # Oldest sessions go first once there are too many or their grids get too large in total
+        while len(self.sessions) > 1:
+            total_cells = sum(s.cells() for s in self.sessions.values())
+            if len(self.sessions) <= MAX_SESSIONS and total_cells <= SESSION_CELL_BUDGET: break
+            oldest = next(iter(self.sessions))
+            if oldest == self.current_file_path: break
+            self.drop_session(oldest)
+
+    def drop_session(self, path):
+        session = self.sessions.pop(path)
+        self.tile_renderers.pop(session.canvas, None)
+        if self.saves_loaded and session.user_grid is not None and self.game_saves.put(path, session.user_grid):
+            if session.journal: session.journal.discard()
+        elif session.journal: session.journal.close()
+        for widget in [session.canvas, session.txt_across, session.txt_down]:
+            if widget is not None: widget.destroy()
+
+    def close_session(self, path):
+        if path not in self.sessions: return
+        if path == self.current_file_path:
+            others = [p for p in self.sessions if p != path]
+            if not others: return
+            self.switch_session(others[-1])
+            if path == self.current_file_path: return
+        self.drop_session(path)
+        self.update_tabs()
+
+    def save_all_sessions(self):
+        self.save_current_progress()
+        if not self.saves_loaded: return
+        for path, session in self.sessions.items():
+            if path != self.current_file_path and session.user_grid is not None:
+                if self.game_saves.put(path, session.user_grid) and session.journal: session.journal.discard()
+
+    def update_tabs(self):
+        for child in self.tab_frame.winfo_children(): child.destroy()
+        if len(self.sessions) < 2: return
+        c = self.c
+        for path in sorted(self.sessions, key=os.path.basename):
+            is_current = path == self.current_file_path
+            btn = tk.Button(self.tab_frame, text=os.path.basename(path), font=("Arial", 9), takefocus=0,
+                            relief=tk.SUNKEN if is_current else tk.GROOVE, bg=c.get('btn_bg'), fg=c.get('btn_fg'),
+                            command=lambda p=path: self.switch_session(p))
+            btn.bind("<Button-3>", lambda e, p=path: self.close_session(p))
+            btn.pack(side=tk.LEFT, padx=(0, 2), pady=(2, 0))
+
+    # --- Session Recording ---
+    def start_recording(self):
+        if not self.puzzle:
+            messagebox.showinfo("Record Session", "Open a puzzle first.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".jsonl", filetypes=[("Session Recordings", "*.jsonl")])
+        if not path: return
+        self.stop_recording()
+        self.recorder = SessionRecorder(path, self)
+        self.file_menu.entryconfig("Stop Recording Session", state=tk.NORMAL)
+
+    def log_file_switch(self):
+        # Logged with the grid it opened with, which replay pins since its saves are empty
+        if self.recorder: self.recorder.log("file", os.path.abspath(self.current_file_path), "".join(self.user_grid))
+
+    def stop_recording(self):
+        if not self.recorder: return
+        self.recorder.close(self)
+        self.recorder = None
+        self.file_menu.entryconfig("Stop Recording Session", state=tk.DISABLED)
+
+    # --- Co-op ---
+    def coop_room_id(self):
+        digest = zlib.crc32("".join(self.solution_grid).encode("utf-8"))
+        return f"{self.width}x{self.height}-{digest:08x}"
+
+    def join_coop(self):
+        if not self.puzzle:
+            messagebox.showinfo("Co-op", "Open a puzzle first.")
+            return
+        server = simpledialog.askstring("Co-op", "Server (host:port):", initialvalue=self.coop_server, parent=self.root)
+        if not server: return
+        name = simpledialog.askstring("Co-op", "Your name:", initialvalue=self.coop_name or "solver", parent=self.root)
+        if not name: return
+        try: host, port = parse_host_port(server)
+        except ValueError:
+            messagebox.showerror("Co-op", f"Not a host:port address: {server}")
+            return
+        self.leave_coop()
+        self.coop_server, self.coop_name = server, name
+        self.save_settings()
+        self.coop_events = queue.Queue()
+        self.coop = CoopClient(host, port, self.coop_room_id(), name, len(self.user_grid), self.coop_events)
+        self.coop_path = self.current_file_path
+        self.coop_pending = {}
+        self.coop_id = None
+        self.coop_menu.entryconfig(1, state=tk.NORMAL)
+        self.root.title(f"Python .puz Solver - v22.1 — co-op as {name}")
+        self.root.after(30, self.poll_coop)
+
+    def confirm_leave_coop(self):
+        # Co-op is tied to the puzzle on screen, so showing another one ends it; ask first
+        if not self.coop: return True
+        if not messagebox.askyesno("Co-op", "Switching puzzles leaves the co-op session. Continue?"): return False
+        self.leave_coop()
+        return True
+
+    def leave_coop(self):
+        if not self.coop: return
+        self.coop.close()
+        self.coop = None
+        self.coop_path = None
+        self.coop_pending = {}
+        self.coop_id = None
+        self.coop_menu.entryconfig(1, state=tk.DISABLED)
+        self.root.title("Python .puz Solver - v22.1")
+
+    def poll_coop(self):
+        if not self.coop: return
+        client = self.coop
+        changed, cells = False, set()
+        while True:
+            try: msg = self.coop_events.get_nowait()
+            except queue.Empty: break
+            kind = msg.get("t")
+            if kind == "snap":
+                self.coop_id = msg.get("you")
+                changed |= self.apply_coop_snapshot(msg.get("cells", []))
+            elif kind == "d": cells.update(self.apply_coop_deltas(msg.get("d", [])))
+            elif kind == "error":
+                self.leave_coop()
+                messagebox.showerror("Co-op", f"Connection failed: {msg.get('error')}")
+                return
+            elif kind == "closed":
+                self.leave_coop()
+                return
+        if changed: self.refresh_grid()
+        elif cells: self.refresh_cells(cells)
+        if self.coop is client: self.root.after(30, self.poll_coop)
+
+    def apply_coop_snapshot(self, cells):
+        if not cells:
+            # First one in the room seeds it with the local progress
+            for idx, ch in enumerate(self.user_grid):
+                if ch not in ['-', '.']: self.coop_pending[idx] = self.coop.send(idx, ch)
+            return False
+        remote = {int(i): ch for i, ch in cells}
+        self.coop_applying = True
+        try:
+            for idx, sol in enumerate(self.solution_grid):
+                if sol != '.': self.set_cell(idx, remote.get(idx, '-'))
+        finally: self.coop_applying = False
+        return True
+
+    def apply_coop_deltas(self, deltas):
+        # Deltas arrive in server order. While one of our own edits to a cell is still in flight,
+        # other writers' edits to that cell are skipped: ours reaches the server later and wins.
+        changed = []
+        self.coop_applying = True
+        try:
+            for idx, letter, author, seq in deltas:
+                if not (0 <= idx < len(self.user_grid)) or self.solution_grid[idx] == '.': continue
+                pending = self.coop_pending.get(idx)
+                if author == self.coop_id:
+                    if pending is not None and seq >= pending: del self.coop_pending[idx]
+                    continue
+                if pending is not None: continue
+                if self.user_grid[idx] != letter:
+                    self.set_cell(idx, letter)
+                    changed.append(idx)
+        finally: self.coop_applying = False
+        return changed
+
+    # --- Staged Startup ---
+    def start_deferred_load(self):
+        # First idle callback after mainloop starts: the window has been mapped and drawn
+        self.startup_times["first_paint"] = time.perf_counter() - STARTUP_T0
+        last_file = self.last_opened_file
+        def work():
+            saves = SaveStore(self.saves_data_file, self.saves_index_file, self.saves_file)
+            puzzle, files = None, None
+            if last_file and puzzle_exists(last_file):
+                try:
+                    puzzle = read_puzzle(last_file)
+                    files = self.list_puz_files(os.path.dirname(last_file))
+                except Exception: puzzle = None
+            return saves, puzzle, files
+        self.run_in_background(work, self.finish_deferred_load)
+
+    def finish_deferred_load(self, result):
+        saves, puzzle, files = result
+        self.game_saves = saves
+        self.saves_loaded = True
+        self.restore_early_opens()
+        self.canvas.delete("placeholder")
+        if self.puzzle is None:
+            if puzzle is not None:
+                self.load_puz_file(self.last_opened_file, puzzle=puzzle, sidebar_files=files)
+            else:
+                self.lbl_filename.config(text="No File Selected")
+        self.startup_times["interactive"] = time.perf_counter() - STARTUP_T0
+
+    def restore_early_opens(self):
+        # Puzzles opened while the saves were still loading started blank. They get their stored grid
+        # now, before anything could save the blank one over it; cells typed in the meantime are kept.
+        for path in self.opened_before_saves:
+            session = self.sessions.get(path)
+            if session is None or (self.coop and path == self.coop_path): continue
+            holder = self if path == self.current_file_path else session
+            saved = self.game_saves.get(path)
+            if saved is None or len(saved) != len(holder.user_grid): continue
+            typed = {idx: new for group in holder.history.undo for idx, old, new in group}
+            holder.user_grid[:] = saved
+            for idx, ch in typed.items(): holder.user_grid[idx] = ch
+            holder.entry_index.rebuild(holder.user_grid)
+            if holder.journal and holder.journal.f:
+                try: holder.journal.snapshot(holder.user_grid)
+                except OSError: pass
+            if holder is self:
+                self.refresh_grid()
+                self.update_clue_display()
+            else:
+                session.render_key = None
+        self.opened_before_saves = set()
+
+    def startup_report(self):
+        order = ["constructed", "first_paint", "interactive"]
+        return "\n".join(f"{k:>12}: {self.startup_times[k] * 1000:8.1f} ms" for k in order if k in self.startup_times)
 
     # --- Persistence ---
     def load_json(self, filepath, default):
@@ -213,14 +1921,21 @@ class CrosswordApp:
         except: pass
 
     def on_close(self):
-        self.save_current_progress()
+        self.stop_recording()
+        if self.folder_watcher: self.folder_watcher.stop()
+        self.leave_coop()
+        self.save_all_sessions()
         self.save_settings()
+        self.save_thumbnail_cache()
+        if self.thumb_pool: self.thumb_pool.shutdown(wait=False, cancel_futures=True)
         self.root.destroy()
 
     def save_current_progress(self):
-        if self.puzzle and self.current_file_path:
-            self.game_saves[self.current_file_path] = self.user_grid
-            self.save_json(self.saves_file, self.game_saves)
+        # Nothing is written before the saves index has been read
+        if self.puzzle and self.current_file_path and self.saves_loaded:
+            # A failed save leaves the journal as the durable copy
+            if self.game_saves.put(self.current_file_path, self.user_grid) and self.journal: self.journal.discard()
+            self.schedule_sidebar_columns()
 
     def load_settings(self):
         data = self.load_json(self.settings_file, {})
@@ -230,9 +1945,17 @@ class CrosswordApp:
         self.var_ctrl_mode.set(data.get("ctrl_mode", "letter"))
         self.var_skip_filled.set(data.get("skip_filled", True))
         self.var_end_behavior.set(data.get("end_behavior", "next"))
+        self.var_suggestions.set(data.get("suggestions", False))
+        self.var_renderer.set(data.get("renderer", "canvas"))
+        self.var_thumbnails.set(data.get("thumbnails", True))
+        self.sidebar_sort, self.sidebar_descending = data.get("sidebar_sort", ["name", False])
+        self.sidebar_column = data.get("sidebar_column")
         self.cell_size = data.get("cell_size", 35)
         self.clue_font_size = data.get("clue_font_size", 10)
         self.last_opened_file = data.get("last_file", "")
+        self.library_folder = data.get("library_folder", "")
+        self.coop_server = data.get("coop_server", self.coop_server)
+        self.coop_name = data.get("coop_name", "")
         geom = data.get("geometry", "1200x750")
         try: self.root.geometry(geom)
         except: pass
@@ -244,10 +1967,18 @@ class CrosswordApp:
             "ctrl_mode": self.var_ctrl_mode.get(),
             "skip_filled": self.var_skip_filled.get(),
             "end_behavior": self.var_end_behavior.get(),
+            "suggestions": self.var_suggestions.get(),
+            "renderer": self.var_renderer.get(),
+            "thumbnails": self.var_thumbnails.get(),
+            "sidebar_sort": [self.sidebar_sort, self.sidebar_descending],
+            "sidebar_column": self.sidebar_column,
             "cell_size": self.cell_size,
             "clue_font_size": self.clue_font_size,
             "geometry": self.root.geometry(),
-            "last_file": self.current_file_path
+            "last_file": self.current_file_path,
+            "library_folder": self.library_folder,
+            "coop_server": self.coop_server,
+            "coop_name": self.coop_name
         }
         self.save_json(self.settings_file, data)
 
@@ -261,6 +1992,7 @@ class CrosswordApp:
 
     # --- Handlers ---
     def handle_tab(self, event):
+        if self.recorder: self.recorder.log("tab", event.state & 0x0001)
         if event.state & 0x0001:
             self.jump_to_next_word(forward=False, skip_full_words=True)
         else:
@@ -268,10 +2000,12 @@ class CrosswordApp:
         return "break"
 
     def handle_shift_tab(self, event):
+        if self.recorder: self.recorder.log("tab", 1)
         self.jump_to_next_word(forward=False, skip_full_words=True)
         return "break"
 
     def handle_ctrl_key(self, event):
+        if self.recorder: self.recorder.log("ctrl", event.keysym)
         if self.var_ctrl_mode.get() == "word":
             self.reveal_current_word()
             # FORCE jump to next word immediately after revealing
@@ -299,11 +2033,9 @@ class CrosswordApp:
     def get_selected_file_path(self):
         selection = self.file_listbox.curselection()
         if not selection: return None
-        filename = self.file_listbox.get(selection[0])
-        if filename.startswith("⭐ "):
-            filename = filename.replace("⭐ ", "")
-        if self.current_file_path:
-            return os.path.join(os.path.dirname(self.current_file_path), filename)
+        filename = self.sidebar_entry_name(self.file_listbox.get(selection[0]))
+        if self.sidebar_folder is not None and filename != "..":
+            return os.path.join(self.sidebar_folder, *filename.split("/"))
         return None
 
     def toggle_favorite(self):
@@ -315,12 +2047,20 @@ class CrosswordApp:
         else:
             self.favorites.append(path)
         self.save_json(self.favorites_file, self.favorites)
-        if self.current_file_path:
-            self.update_sidebar(os.path.dirname(self.current_file_path))
+        name = os.path.basename(path)
+        pos, present = self.sidebar_position(name)
+        if present:
+            selected = self.file_listbox.selection_includes(pos)
+            self.file_listbox.delete(pos)
+            self.file_listbox.insert(pos, self.sidebar_display_name(name))
+            if selected: self.file_listbox.selection_set(pos)
 
     def delete_file(self):
         path = self.get_selected_file_path()
         if not path: return
+        if split_archive_path(path)[0] is not None:
+            messagebox.showinfo("Cannot Delete", "Puzzles inside a zip archive cannot be deleted individually.")
+            return
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to permanently delete:\n{os.path.basename(path)}?"):
             try:
                 os.remove(path)
@@ -328,8 +2068,7 @@ class CrosswordApp:
                 if abs_path in self.favorites:
                     self.favorites.remove(abs_path)
                     self.save_json(self.favorites_file, self.favorites)
-                if self.current_file_path:
-                    self.update_sidebar(os.path.dirname(self.current_file_path))
+                self.apply_sidebar_changes({os.path.basename(path): "remove"})
             except Exception as e:
                 messagebox.showerror("Error", f"Could not delete file: {e}")
 
@@ -387,16 +2126,32 @@ class CrosswordApp:
         self.sidebar_frame.config(bg=c['input_bg'])
         self.sidebar_label.config(bg=c['input_bg'], fg=c['fg'])
         self.file_listbox.config(bg=c['input_bg'], fg=c['fg'], selectbackground=c['highlight'], selectforeground=c['fg'])
+        self.thumb_canvas.config(bg=c['input_bg'])
+        self.stats_canvas.config(bg=c['input_bg'])
+        self.sidebar_header.config(bg=c['input_bg'])
+        for btn in [self.btn_sort_name, self.btn_stats_column]:
+            btn.config(bg=c['input_bg'], fg=c['fg'], activebackground=c['highlight'], activeforeground=c['fg'])
+        self.update_sort_headings()
+        self.schedule_sidebar_columns()
         
-        for lbl in [self.lbl_filename, self.lbl_current_clue, self.lbl_across, self.lbl_down]:
+        for lbl in [self.lbl_filename, self.lbl_current_clue, self.lbl_across, self.lbl_down, self.lbl_suggestions]:
             lbl.config(bg=c['panel_bg'], fg=c['fg'])
         for btn in [self.btn_sidebar, self.btn_text_plus, self.btn_text_minus, self.btn_grid_plus, self.btn_grid_minus]:
             btn.config(bg=c['btn_bg'], fg=c['btn_fg'])
+        self.tab_frame.config(bg=c['bg'])
+        for btn in self.tab_frame.winfo_children():
+            btn.config(bg=c['btn_bg'], fg=c['btn_fg'])
 
         self.grid_frame.config(bg=c['bg'])
-        self.canvas.config(bg=c['bg'])
         self.clues_frame.config(bg=c['bg'])
-        
+        self.theme_view_widgets()
+            
+        self.refresh_grid()
+        self.update_clue_display()
+
+    def theme_view_widgets(self):
+        c = self.c
+        self.canvas.config(bg=c['bg'])
         clue_font = ("Arial", self.clue_font_size)
         for txt in [self.txt_across, self.txt_down]:
             txt.config(bg=c['input_bg'], fg=c['fg'], selectbackground=c['highlight'], font=clue_font)
@@ -404,9 +2159,6 @@ class CrosswordApp:
             txt.tag_config("completed", foreground=c['completed'])
             txt.tag_config("ref", foreground=c['ref_text'], font=("Arial", self.clue_font_size, "bold"))
             txt.tag_config("default", background=c['input_bg'], foreground=c['fg'])
-            
-        self.refresh_grid()
-        self.update_clue_display()
 
     def change_grid_zoom(self, delta):
         new_cell = self.cell_size + delta
@@ -423,27 +2175,50 @@ class CrosswordApp:
             self.save_settings()
 
     def clean_clue_text(self, text):
-        if not text: return ""
-        text = re.sub(r'<[^>]+>', '', text)
-        text = html.unescape(text)
-        return text
+        return clean_clue_text(text)
+
+    def run_in_background(self, work, on_done):
+        # Runs work() on a thread and hands its result to on_done() back on the Tk thread
+        results = queue.Queue()
+        def worker():
+            try: results.put((True, work()))
+            except Exception as e: results.put((False, e))
+        def poll():
+            try: ok, value = results.get_nowait()
+            except queue.Empty:
+                self.root.after(50, poll)
+                return
+            if ok: on_done(value)
+            else: messagebox.showerror("Error", str(value))
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(50, poll)
 
     def browse_file(self):
         filename = filedialog.askopenfilename(filetypes=[("Puzzle Files", "*.puz"), ("All Files", "*.*")])
         if filename: self.load_puz_file(filename)
 
-    def load_puz_file(self, filename):
+    def load_puz_file(self, filename, puzzle=None, sidebar_files=None):
+        if filename in self.sessions:
+            self.switch_session(filename)
+            return
         try:
-            self.save_current_progress()
-            self.puzzle = puz.read(filename)
-            self.current_file_path = filename
+            if puzzle is None: puzzle = read_puzzle(filename)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load file.\n\nDetails: {e}")
             return
+        if not self.confirm_leave_coop(): return
+        self.save_current_progress()
+        if self.puzzle is not None:
+            self.stash_session()
+            self.create_view_widgets()
+            self.theme_view_widgets()
+        self.puzzle = puzzle
+        self.current_file_path = filename
+        self.highlighted_ref_indices = set()
 
         base_name = os.path.basename(filename)
         self.lbl_filename.config(text=base_name)
-        self.update_sidebar(os.path.dirname(filename))
+        self.show_in_sidebar(filename, sidebar_files)
 
         self.width = self.puzzle.width
         self.height = self.puzzle.height
@@ -455,17 +2230,22 @@ class CrosswordApp:
             self.is_redacted = True
             self.var_error_check.set(False)
 
-        if self.current_file_path in self.game_saves:
-            saved_grid = self.game_saves[self.current_file_path]
+        saved_grid = self.game_saves.get(self.current_file_path) if self.saves_loaded else None
+        if saved_grid is not None:
             if len(saved_grid) == len(self.solution_grid):
                 self.user_grid = saved_grid
             else:
                 self.user_grid = ['-' if c != '.' else '.' for c in self.solution_grid]
         else:
             self.user_grid = ['-' if c != '.' else '.' for c in self.solution_grid]
+        self.history = EditHistory()
+        self.journal = ProgressJournal(filename)
+        recovered = self.journal.recover(len(self.solution_grid))
+        if recovered is not None: self.user_grid = recovered
+        elif not self.saves_loaded: self.opened_before_saves.add(filename)
         
-        self.canvas.config(width=self.width * self.cell_size, height=self.height * self.cell_size)
         self.parse_clues()
+        self.entry_index = EntryIndex(self.clue_mapping, self.width, self.solution_grid, self.user_grid)
         self.cursor_col = 0
         self.cursor_row = 0
         self.direction = 'across'
@@ -475,37 +2255,381 @@ class CrosswordApp:
         self.update_clue_display()
         self.refresh_grid() 
         
+        self.register_session()
         self.save_settings()
         if not self.sidebar_visible: self.toggle_sidebar()
+        self.log_file_switch()
 
     def reset_puzzle(self):
         if not self.puzzle: return
-        if messagebox.askyesno("Reset Puzzle", "Are you sure you want to clear all progress?\nThis cannot be undone."):
-            self.user_grid = ['-' if c != '.' else '.' for c in self.solution_grid]
-            self.cursor_col = 0
-            self.cursor_row = 0
-            self.find_first_valid_cell()
-            self.refresh_grid()
-            self.update_clue_display()
-            self.save_current_progress()
+        if messagebox.askyesno("Reset Puzzle", "Are you sure you want to clear all progress?\nEdit > Undo brings it back."):
+            if self.recorder: self.recorder.log("reset")
+            self.clear_all_cells()
 
-    def update_sidebar(self, folder_path):
+    def clear_all_cells(self):
+        self.history.begin()
+        try:
+            for idx, ch in enumerate(self.solution_grid):
+                if ch != '.': self.set_cell(idx, '-')
+        finally: self.history.end()
+        self.cursor_col = 0
+        self.cursor_row = 0
+        self.find_first_valid_cell()
+        self.refresh_grid(follow_cursor=True)
+        self.update_clue_display()
+        self.save_current_progress()
+
+    def list_puz_files(self, folder_path):
+        archive, member = split_archive_path(folder_path or ".")
+        if archive is not None:
+            return [".."] + list_archive_folder(archive, member)
+        files = [f for f in os.listdir(folder_path or ".") if f.lower().endswith(('.puz', '.zip'))]
+        files.sort()
+        return files
+
+    def sidebar_display_name(self, f):
+        if f.lower().endswith('.zip'): return "📦 " + f
+        full_p = os.path.abspath(os.path.join(self.sidebar_folder, f))
+        return "⭐ " + f if full_p in self.favorites else f
+
+    def sidebar_entry_name(self, display_name):
+        for prefix in ("⭐ ", "📦 "):
+            if display_name.startswith(prefix): return display_name[len(prefix):]
+        return display_name
+
+    def update_sidebar(self, folder_path, files=None, force=False):
+        # The folder is listed once; after that the watcher keeps the list current
+        if folder_path == self.sidebar_folder and not force:
+            self.select_in_sidebar()
+            return
         self.file_listbox.delete(0, tk.END)
+        self.sidebar_folder = folder_path
+        self.sidebar_files = []
         try:
-            files = [f for f in os.listdir(folder_path) if f.lower().endswith('.puz')]
-            files.sort()
-            for f in files:
-                full_p = os.path.abspath(os.path.join(folder_path, f))
-                display_name = "⭐ " + f if full_p in self.favorites else f
-                self.file_listbox.insert(tk.END, display_name)
-            current_name = os.path.basename(self.current_file_path)
-            for i in range(self.file_listbox.size()):
-                item = self.file_listbox.get(i)
-                if item == current_name or item == "⭐ " + current_name:
-                    self.file_listbox.selection_set(i)
-                    self.file_listbox.see(i)
-                    break
+            if files is None: files = self.list_puz_files(folder_path)
+            self.sidebar_files = self.sorted_sidebar_files(files)
+            for f in self.sidebar_files:
+                self.file_listbox.insert(tk.END, self.sidebar_display_name(f))
+            self.select_in_sidebar()
         except: pass
+        self.watch_folder(folder_path)
+        self.analyze_sidebar_folder()
+
+    def watch_folder(self, folder_path):
+        if self.folder_watcher:
+            if self.folder_watcher.folder == (folder_path or ".") and self.folder_watcher.thread.is_alive(): return
+            self.folder_watcher.stop()
+            self.folder_watcher = None
+        if not self.watch_polling:
+            self.watch_polling = True
+            self.root.after(150, self.poll_folder_events)
+        self.pending_sidebar = {}
+        # Archives are read-only snapshots; only real folders are watched
+        if split_archive_path(folder_path or ".")[0] is None:
+            self.folder_watcher = FolderWatcher(folder_path, self.watch_events, suffixes=('.puz', '.zip'))
+
+    def poll_folder_events(self):
+        # Bulk drops arrive as hundreds of events; apply them once the folder has been quiet
+        # for SIDEBAR_DEBOUNCE seconds, or at the latest after SIDEBAR_MAX_DELAY
+        now = time.monotonic()
+        watched = self.folder_watcher.folder if self.folder_watcher else None
+        while True:
+            try: kind, folder, name = self.watch_events.get_nowait()
+            except queue.Empty: break
+            if folder != watched: continue
+            if not self.pending_sidebar: self.pending_first = now
+            self.pending_sidebar[name] = kind
+            self.pending_last = now
+        if self.pending_sidebar and (now - self.pending_last >= SIDEBAR_DEBOUNCE or now - self.pending_first >= SIDEBAR_MAX_DELAY):
+            changes, self.pending_sidebar = self.pending_sidebar, {}
+            self.apply_sidebar_changes(changes)
+        self.root.after(150, self.poll_folder_events)
+
+    def apply_sidebar_changes(self, changes):
+        if "rescan" in changes.values():
+            self.update_sidebar(self.sidebar_folder, force=True)
+            return
+        if self.sidebar_sort != "name":
+            # Sorted by a metric: apply the whole batch to the name set and re-sort once
+            names = set(self.sidebar_files)
+            for name in changes:
+                if os.path.exists(os.path.join(self.sidebar_folder or ".", name)): names.add(name)
+                else: names.discard(name)
+            self.resort_sidebar(names)
+            self.analyze_sidebar_folder()
+            return
+        for name, kind in sorted(changes.items()):
+            # Trust the filesystem over the event: a file may have come and gone within one batch
+            exists = os.path.exists(os.path.join(self.sidebar_folder or ".", name))
+            pos, present = self.sidebar_position(name)
+            if exists and not present:
+                self.sidebar_files.insert(pos, name)
+                self.file_listbox.insert(pos, self.sidebar_display_name(name))
+            elif not exists and present:
+                del self.sidebar_files[pos]
+                self.file_listbox.delete(pos)
+        self.analyze_sidebar_folder()
+
+    def sidebar_row(self, path):
+        # Row of path in the current listing, matched relative to the listed folder so nested
+        # archive members ("sub/x.puz") are found too; None if it is not listed
+        if self.sidebar_folder is None or not path: return None
+        try: rel = os.path.relpath(path, self.sidebar_folder)
+        except ValueError: return None
+        name = rel.replace(os.sep, "/")
+        if name.startswith("../") or name not in self.sidebar_files: return None
+        return self.sidebar_files.index(name)
+
+    def show_in_sidebar(self, path, files=None):
+        # Stays on the current listing when it already shows path, else lists the file's folder
+        if self.sidebar_row(path) is None: self.update_sidebar(os.path.dirname(path), files)
+        else: self.select_in_sidebar()
+
+    def select_in_sidebar(self):
+        self.file_listbox.selection_clear(0, tk.END)
+        row = self.sidebar_row(self.current_file_path)
+        if row is not None:
+            self.file_listbox.selection_set(row)
+            self.file_listbox.see(row)
+
+    # --- Sidebar Sorting and Statistics ---
+    # The sidebar is ordered by name unless a statistics column is sorted; sidebar_files always
+    # holds the names in display order. Only name order is kept up by bisection; a metric order
+    # is rebuilt in one sort whenever the names or the stats change.
+    def sidebar_sort_key(self, name):
+        if self.sidebar_sort == "name": return name
+        stats = self.library_stats.get(os.path.join(self.sidebar_folder or ".", *name.split("/"))) if self.library_stats else None
+        value = stats.get(self.sidebar_sort) if stats else None
+        if value is not None and self.sidebar_descending: value = -value
+        # ".." stays on top and unanalyzed entries go last
+        return (name != "..", value is None, value or 0, name)
+
+    def sorted_sidebar_files(self, files):
+        return sorted(files, key=self.sidebar_sort_key)
+
+    def sidebar_position(self, name):
+        if self.sidebar_sort == "name":
+            pos = bisect.bisect_left(self.sidebar_files, name)
+            return pos, pos < len(self.sidebar_files) and self.sidebar_files[pos] == name
+        try: return self.sidebar_files.index(name), True
+        except ValueError: return len(self.sidebar_files), False
+
+    def resort_sidebar(self, names=None):
+        files = self.sorted_sidebar_files(self.sidebar_files if names is None else names)
+        if files != self.sidebar_files:
+            top = self.file_listbox.yview()[0]
+            self.sidebar_files = files
+            self.file_listbox.delete(0, tk.END)
+            self.file_listbox.insert(tk.END, *[self.sidebar_display_name(f) for f in files])
+            self.select_in_sidebar()
+            self.file_listbox.yview_moveto(top)
+        self.schedule_sidebar_columns()
+
+    def set_sidebar_sort(self, key):
+        # Picking the sorted column again flips its direction; "Hide Column" goes back to names
+        if key is None:
+            self.sidebar_column, self.sidebar_sort, self.sidebar_descending = None, "name", False
+            self.stats_canvas.pack_forget()
+        elif key == "name":
+            self.sidebar_sort, self.sidebar_descending = "name", False
+        else:
+            self.sidebar_descending = not self.sidebar_descending if self.sidebar_sort == key else False
+            self.sidebar_sort = self.sidebar_column = key
+            if not self.stats_canvas.winfo_ismapped():
+                self.stats_canvas.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 2), pady=2, before=self.file_listbox)
+        self.update_sort_headings()
+        self.save_settings()
+        self.resort_sidebar()
+        self.analyze_sidebar_folder()
+
+    def update_sort_headings(self):
+        arrow = " ▼" if self.sidebar_descending else " ▲"
+        self.btn_sort_name.config(text="Name" + (arrow if self.sidebar_sort == "name" else ""))
+        label = next((lbl for key, lbl, fmt in LIBRARY_METRICS if key == self.sidebar_column), "Stats")
+        self.btn_stats_column.config(text=label + (arrow if self.sidebar_sort == self.sidebar_column else " ▾"))
+
+    def analyze_sidebar_folder(self):
+        # Fills in metrics for listed puzzles in the background, then re-sorts with them
+        if not self.sidebar_column or self.sidebar_folder is None: return
+        if self.stats_running:
+            self.stats_rerun = True
+            return
+        folder, stats = self.sidebar_folder, self.library_stats
+        paths = [os.path.join(folder, *f.split("/")) for f in self.sidebar_files if f.lower().endswith('.puz')]
+        self.stats_running = True
+        def work():
+            # Updates a copy (the stats file is read here too, the first time round); the Tk side
+            # keeps sorting and drawing from the current stats until done() swaps this one in
+            loaded = stats.copy() if stats else LibraryStats()
+            try: return loaded, loaded.update(paths)
+            except Exception as e: return e, 0
+        def done(result):
+            loaded, count = result
+            self.stats_running = False
+            if isinstance(loaded, Exception):
+                self.stats_rerun = False
+                messagebox.showerror("Error", f"Analyzing the folder failed.\n\nDetails: {loaded}")
+                return
+            self.library_stats = loaded
+            if self.stats_rerun:
+                self.stats_rerun = False
+                self.analyze_sidebar_folder()
+            if folder == self.sidebar_folder and (count or stats is None): self.resort_sidebar()
+        self.run_in_background(work, done)
+
+    def refresh_stats_column(self):
+        self.stats_canvas.delete("all")
+        if not self.sidebar_column or not self.sidebar_visible or self.sidebar_folder is None or self.library_stats is None: return
+        fmt = next(f for key, lbl, f in LIBRARY_METRICS if key == self.sidebar_column)
+        self.stats_canvas.config(width=self.stats_width)
+        dy = self.file_listbox.winfo_y() - self.stats_canvas.winfo_y()
+        for row in self.visible_sidebar_rows():
+            if row >= len(self.sidebar_files) or not self.sidebar_files[row].lower().endswith('.puz'): continue
+            stats = self.library_stats.get(os.path.join(self.sidebar_folder, *self.sidebar_files[row].split("/")))
+            value = stats.get(self.sidebar_column) if stats else None
+            bbox = self.file_listbox.bbox(row)
+            if bbox is None: continue
+            self.stats_canvas.create_text(self.stats_width - 2, bbox[1] + dy + bbox[3] // 2, anchor="e",
+                                          text="–" if value is None else fmt.format(value),
+                                          font=("Arial", 9), fill=self.c['fg'])
+
+    # --- Sidebar Thumbnails ---
+    # Each puzzle row gets a row-high picture of its block pattern, with filled cells from its
+    # save tinted. Layouts come from a worker pool and are cached on disk by file mtime; only
+    # rows in view are looked up, rendered or requested.
+    def toggle_thumbnails(self):
+        if self.var_thumbnails.get():
+            self.thumb_canvas.pack(side=tk.LEFT, fill=tk.Y, padx=(2, 0), pady=2, before=self.file_listbox)
+            self.schedule_sidebar_columns()
+        else:
+            self.thumb_canvas.pack_forget()
+            self.thumb_canvas.delete("all")
+            self.thumb_images.clear()
+        self.save_settings()
+
+    def schedule_sidebar_columns(self):
+        if self.sidebar_refresh_queued: return
+        self.sidebar_refresh_queued = True
+        self.root.after_idle(self.refresh_sidebar_columns)
+
+    def refresh_sidebar_columns(self):
+        self.sidebar_refresh_queued = False
+        self.refresh_thumbnails()
+        self.refresh_stats_column()
+
+    def visible_sidebar_rows(self):
+        size = self.file_listbox.size()
+        if not size: return range(0)
+        first = self.file_listbox.nearest(0)
+        last = self.file_listbox.nearest(self.file_listbox.winfo_height())
+        return range(first, min(last + 1, size))
+
+    def refresh_thumbnails(self):
+        self.thumb_canvas.delete("all")
+        if not self.var_thumbnails.get() or not self.sidebar_visible or self.sidebar_folder is None: return
+        if self.thumb_layouts is None: self.thumb_layouts = self.load_json(THUMBNAIL_CACHE_FILE, {})
+        size = self.thumb_size
+        self.thumb_canvas.config(width=size)
+        dy = self.file_listbox.winfo_y() - self.thumb_canvas.winfo_y()
+        wanted = set()
+        for row in self.visible_sidebar_rows():
+            if row >= len(self.sidebar_files) or not self.sidebar_files[row].lower().endswith('.puz'): continue
+            path = os.path.join(self.sidebar_folder, *self.sidebar_files[row].split("/"))
+            key = os.path.abspath(path)
+            try: mtime = puzzle_mtime(path)
+            except OSError: continue
+            layout = self.thumb_layouts.get(key)
+            if layout is None or layout[0] != mtime:
+                wanted.add(key)
+                if key not in self.thumb_pending and self.thumb_failures.get(key, 0) < 3: self.request_thumbnail(key)
+                continue
+            image = self.thumbnail_image(path, key, layout)
+            bbox = self.file_listbox.bbox(row)
+            if image is None or bbox is None: continue
+            y = bbox[1] + dy + (bbox[3] - image.height()) // 2
+            self.thumb_canvas.create_image(size // 2, y, anchor="n", image=image)
+        # Rows scrolled out of view before a worker picked them up are dropped
+        for key in [k for k in self.thumb_pending if k not in wanted]:
+            if self.thumb_pending[key].cancel(): del self.thumb_pending[key]
+
+    def request_thumbnail(self, key):
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        if self.thumb_pool is None: self.thumb_pool = ProcessPoolExecutor(max_workers=2)
+        try: future = self.thumb_pool.submit(_thumbnail_layout, key)
+        except BrokenProcessPool:
+            # A worker died and took the pool with it; start a fresh one
+            self.thumb_pool.shutdown(wait=False)
+            self.thumb_pool = ProcessPoolExecutor(max_workers=2)
+            future = self.thumb_pool.submit(_thumbnail_layout, key)
+        future.add_done_callback(lambda f: self.thumbnail_done(key, f))
+        self.thumb_pending[key] = future
+        if not self.thumb_polling:
+            self.thumb_polling = True
+            self.root.after(50, self.poll_thumbnails)
+
+    def thumbnail_done(self, key, future):
+        # Runs on the pool's thread; a failed future still reports back so the key leaves pending
+        if future.cancelled(): return
+        try: self.thumb_results.put(future.result())
+        except Exception: self.thumb_results.put((key, None))
+
+    def poll_thumbnails(self):
+        got = failed = False
+        while True:
+            try: key, layout = self.thumb_results.get_nowait()
+            except queue.Empty: break
+            self.thumb_pending.pop(key, None)
+            if layout is None:
+                self.thumb_failures[key] = self.thumb_failures.get(key, 0) + 1
+                failed = True
+                continue
+            if layout[0] is None: continue
+            self.thumb_failures.pop(key, None)
+            self.thumb_layouts[key] = layout
+            self.thumb_dirty = got = True
+        # Failed rows are asked for again shortly, a few times at most
+        if failed: self.root.after(1000, self.schedule_sidebar_columns)
+        if got:
+            self.schedule_sidebar_columns()
+            self.root.after(5000, self.save_thumbnail_cache)
+        if self.thumb_pending: self.root.after(50, self.poll_thumbnails)
+        else: self.thumb_polling = False
+
+    def save_thumbnail_cache(self):
+        if not self.thumb_dirty: return
+        self.thumb_dirty = False
+        self.save_json(THUMBNAIL_CACHE_FILE, self.thumb_layouts)
+
+    def thumbnail_image(self, path, key, layout):
+        mtime, w, h, mask_hex = layout
+        if not w or not h: return None
+        save = self.game_saves.index.get(path) if self.saves_loaded else None
+        signature = (mtime, save[2] if save else None, self.var_dark_theme.get())
+        cached = self.thumb_images.get(key)
+        if cached and cached[0] == signature:
+            self.thumb_images.move_to_end(key)
+            return cached[1]
+        blocks = bin(int(mask_hex, 16))[3:]
+        grid = self.game_saves.get(path) if save else None
+        if grid is not None and len(grid) != w * h: grid = None
+        c = self.c
+        colors = {'#': c['black_sq'], '-': c['grid_bg'], '+': c['cursor']}
+        cells = ['#' if blocks[i] == '1' else '+' if grid and grid[i] not in ['-', '.'] else '-' for i in range(w * h)]
+
+        # Whole pixels per cell while the grid fits; larger grids are sampled down
+        scale = self.thumb_size / max(w, h)
+        if scale >= 1: scale = int(scale)
+        pw, ph = max(1, int(w * scale)), max(1, int(h * scale))
+        rows = []
+        for y in range(ph):
+            r = min(h - 1, int(y / scale)) * w
+            rows.append("{" + " ".join(colors[cells[r + min(w - 1, int(x / scale))]] for x in range(pw)) + "}")
+        image = tk.PhotoImage(master=self.thumb_canvas, width=pw, height=ph)
+        image.put(" ".join(rows))
+        self.thumb_images[key] = (signature, image)
+        while len(self.thumb_images) > THUMBNAIL_MEMORY: self.thumb_images.popitem(last=False)
+        return image
 
     def toggle_sidebar(self):
         if self.sidebar_visible:
@@ -516,44 +2640,166 @@ class CrosswordApp:
             self.main_paned.add(self.sidebar_frame, before=self.game_paned, width=200)
             self.sidebar_visible = True
             self.btn_sidebar.config(relief=tk.SUNKEN)
+            self.schedule_sidebar_columns()
 
     def on_file_select(self, event):
         selection = self.file_listbox.curselection()
-        if not selection: return
-        filename = self.file_listbox.get(selection[0])
-        if filename.startswith("⭐ "): filename = filename.replace("⭐ ", "")
-        full_path = os.path.join(os.path.dirname(self.current_file_path), filename)
+        if not selection or self.sidebar_folder is None: return
+        filename = self.sidebar_entry_name(self.file_listbox.get(selection[0]))
+        if filename == "..":
+            # Leave the archive for the folder that contains it
+            archive, member = split_archive_path(self.sidebar_folder)
+            parent = os.path.dirname(self.sidebar_folder) if member else os.path.dirname(archive)
+            self.update_sidebar(parent)
+            return
+        full_path = os.path.join(self.sidebar_folder, *filename.split("/"))
+        if filename.lower().endswith('.zip'):
+            self.update_sidebar(full_path)
+            return
         if full_path != self.current_file_path: self.load_puz_file(full_path)
         self.canvas.focus_set()
 
     def parse_clues(self):
         self.clue_mapping = self.puzzle.clue_numbering()
         self.grid_numbers = {}
-        self.txt_across.config(state=tk.NORMAL)
-        self.txt_across.delete(1.0, tk.END)
-        for clue in self.clue_mapping.across:
-            r = clue['cell'] // self.width
-            c = clue['cell'] % self.width
-            self.grid_numbers[(c, r)] = clue['num']
-            clean_text = self.clean_clue_text(clue['clue'])
-            tag = f"across_{clue['num']}"
-            self.txt_across.insert(tk.END, f"{clue['num']}. {clean_text}\n", tag)
-            self.txt_across.tag_bind(tag, "<Button-1>", lambda e, num=clue['num']: self.click_clue_text(num, 'across'))
-        self.txt_across.config(state=tk.DISABLED)
-
-        self.txt_down.config(state=tk.NORMAL)
-        self.txt_down.delete(1.0, tk.END)
-        for clue in self.clue_mapping.down:
-            r = clue['cell'] // self.width
-            c = clue['cell'] % self.width
-            self.grid_numbers[(c, r)] = clue['num']
-            clean_text = self.clean_clue_text(clue['clue'])
-            tag = f"down_{clue['num']}"
-            self.txt_down.insert(tk.END, f"{clue['num']}. {clean_text}\n", tag)
-            self.txt_down.tag_bind(tag, "<Button-1>", lambda e, num=clue['num']: self.click_clue_text(num, 'down'))
-        self.txt_down.config(state=tk.DISABLED)
+        for txt, direction in [(self.txt_across, 'across'), (self.txt_down, 'down')]:
+            txt.config(state=tk.NORMAL)
+            txt.delete(1.0, tk.END)
+            stale = [tag for tag in txt.tag_names() if tag.startswith(direction + "_")]
+            if stale: txt.tag_delete(*stale)
+        for direction, num, cell, clean_text, answer in iter_entries(self.puzzle, self.clue_mapping):
+            r = cell // self.width
+            c = cell % self.width
+            self.grid_numbers[(c, r)] = num
+            txt = self.txt_across if direction == 'across' else self.txt_down
+            tag = f"{direction}_{num}"
+            txt.insert(tk.END, f"{num}. {clean_text}\n", tag)
+        for txt in [self.txt_across, self.txt_down]:
+            txt.config(state=tk.DISABLED)
+
+    # --- Library Search ---
+    def choose_library_folder(self):
+        folder = filedialog.askdirectory(initialdir=self.library_folder or None)
+        if folder:
+            changed = folder != self.library_folder
+            self.library_folder = folder
+            self.save_settings()
+            # Suggestions would keep coming from the old library until the next rebuild
+            if changed and self.library_index is not None:
+                self.ensure_library_index(lambda index: self.update_clue_display())
+        return folder
+
+    def open_library_search(self):
+        if not self.library_folder:
+            if self.current_file_path: self.library_folder = os.path.dirname(os.path.abspath(self.current_file_path))
+            elif not self.choose_library_folder(): return
+        c = self.c
+        win = tk.Toplevel(self.root)
+        win.title("Search Library")
+        win.geometry("700x450")
+        win.config(bg=c['bg'])
+
+        entry = tk.Entry(win, font=("Arial", 11), bg=c['input_bg'], fg=c['fg'], insertbackground=c['fg'])
+        entry.pack(fill=tk.X, padx=8, pady=(8, 2))
+        status = tk.Label(win, text="Indexing library...", anchor="w", font=("Arial", 9), bg=c['bg'], fg=c['fg'])
+        status.pack(fill=tk.X, padx=8)
+        frame = tk.Frame(win)
+        frame.pack(expand=True, fill=tk.BOTH, padx=8, pady=8)
+        sb = tk.Scrollbar(frame)
+        sb.pack(side=tk.RIGHT, fill=tk.Y)
+        results = tk.Listbox(frame, font=("Arial", 9), borderwidth=0, yscrollcommand=sb.set,
+                             bg=c['input_bg'], fg=c['fg'], selectbackground=c['highlight'], selectforeground=c['fg'])
+        results.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        sb.config(command=results.yview)
+        hits = []
+
+        def run_query(event=None):
+            if self.library_index is None: return
+            hits[:] = self.library_index.search(entry.get())
+            results.delete(0, tk.END)
+            for path, d, num, clue, answer in hits:
+                results.insert(tk.END, f"{answer}  —  {num}-{d.capitalize()}: {clue}  ({os.path.basename(path)})")
+            status.config(text=f"{len(hits)} matches in {len(self.library_index.entries)} clues  ·  '=WORD' matches answers")
+
+        def open_hit(event=None):
+            selection = results.curselection()
+            if not selection: return
+            path, d, num, clue, answer = hits[selection[0]]
+            if os.path.abspath(path) != os.path.abspath(self.current_file_path or ""):
+                self.load_puz_file(path)
+            if self.puzzle and os.path.abspath(path) == os.path.abspath(self.current_file_path):
+                self.click_clue_text(num, d)
+                self.canvas.focus_set()
+
+        def indexed(index):
+            if win.winfo_exists(): run_query()
+
+        entry.bind("<Return>", run_query)
+        entry.bind("<KeyRelease>", run_query)
+        results.bind("<Double-Button-1>", open_hit)
+        results.bind("<Return>", open_hit)
+        entry.focus_set()
+        self.ensure_library_index(indexed)
+
+    def ensure_library_index(self, on_ready):
+        # One build at a time, on a copy; the Tk side only ever sees a finished index
+        if self.library_waiters is not None:
+            self.library_waiters.append(on_ready)
+            return
+        self.library_waiters = [on_ready]
+        current, folder = self.library_index, self.library_folder
+        def build():
+            index = current.copy() if current else LibraryIndex()
+            try: index.update(folder)
+            except Exception as e: return e
+            return index
+        def done(index):
+            waiters, self.library_waiters = self.library_waiters, None
+            if isinstance(index, Exception):
+                messagebox.showerror("Error", f"Indexing the library failed.\n\nDetails: {index}")
+                return
+            self.library_index = index
+            if folder != self.library_folder:
+                # The library folder changed during the build; index the new one for the waiters
+                for callback in waiters: self.ensure_library_index(callback)
+                return
+            for callback in waiters: callback(index)
+        self.run_in_background(build, done)
+
+    def toggle_suggestions(self):
+        self.save_settings()
+        if not self.var_suggestions.get():
+            self.lbl_suggestions.pack_forget()
+            return
+        self.lbl_suggestions.pack(side=tk.TOP, anchor="w", fill=tk.X, pady=(0, 6), before=self.lbl_across)
+        if not self.library_folder and self.current_file_path:
+            self.library_folder = os.path.dirname(os.path.abspath(self.current_file_path))
+        if self.library_folder:
+            # The last finished index keeps serving suggestions while the rebuild runs
+            if self.library_index is None: self.lbl_suggestions.config(text="Suggestions: indexing library...")
+            self.ensure_library_index(lambda index: self.update_clue_display())
+        else:
+            self.lbl_suggestions.config(text="Suggestions: set a library folder (File menu)")
+
+    def update_suggestions(self, clue_text):
+        # Always a finished index: rebuilds run on a copy that replaces this one when done
+        index = self.library_index
+        if not self.var_suggestions.get() or index is None: return
+        coords = self.get_word_range(self.cursor_col, self.cursor_row, self.direction)
+        pattern = "".join(self.user_grid[self.get_index(c, r)] for c, r in coords)
+        pattern = pattern.replace('.', '-')
+        answers = index.suggest(clue_text, pattern, os.path.abspath(self.current_file_path)) if clue_text else []
+        self.lbl_suggestions.config(text="Suggestions: " + ("  ·  ".join(answers) if answers else "—"))
+
+    def on_clue_click(self, event, direction):
+        prefix = direction + "_"
+        for tag in event.widget.tag_names(f"@{event.x},{event.y}"):
+            if tag.startswith(prefix):
+                self.click_clue_text(int(tag[len(prefix):]), direction)
+                return
 
     def click_clue_text(self, num, direction):
+        if self.recorder: self.recorder.log("clue", num, direction)
         target_list = self.clue_mapping.across if direction == 'across' else self.clue_mapping.down
         for clue in target_list:
             if clue['num'] == num:
@@ -561,7 +2807,7 @@ class CrosswordApp:
                 self.cursor_col = clue['cell'] % self.width
                 self.direction = direction
                 self.update_clue_display()
-                self.refresh_grid()
+                self.refresh_grid(follow_cursor=True)
                 return
 
     def find_first_valid_cell(self):
@@ -575,94 +2821,186 @@ class CrosswordApp:
         return row * self.width + col
 
     # --- Grid Logic with Ref Highlighting ---
-    def refresh_grid(self):
+    # --- Grid Viewport ---
+    def scroll_grid_x(self, *args):
+        self.canvas.xview(*args)
+        self.schedule_grid_refresh()
+
+    def scroll_grid_y(self, *args):
+        self.canvas.yview(*args)
+        self.schedule_grid_refresh()
+
+    def on_grid_wheel(self, event):
+        if event.num == 4: step = -1
+        elif event.num == 5: step = 1
+        else: step = -1 if event.delta > 0 else 1
+        if event.state & 0x0001: self.scroll_grid_x("scroll", step * 3, "units")
+        else: self.scroll_grid_y("scroll", step * 3, "units")
+        return "break"
+
+    def schedule_grid_refresh(self):
+        # Coalesces scroll/resize bursts into one repaint of the newly visible cells
+        if self.grid_refresh_pending: return
+        self.grid_refresh_pending = True
+        def run():
+            self.grid_refresh_pending = False
+            self.refresh_grid()
+        self.root.after_idle(run)
+
+    def viewport_size(self):
+        w, h = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if w <= 1 or h <= 1:
+            w, h = int(self.canvas.cget("width")), int(self.canvas.cget("height"))
+        return w, h
+
+    def update_grid_scrollbars(self):
+        full_w, full_h = self.width * self.cell_size, self.height * self.cell_size
+        self.canvas.config(width=min(full_w, GRID_MAX_REQUEST), height=min(full_h, GRID_MAX_REQUEST),
+                           scrollregion=(0, 0, full_w, full_h),
+                           xscrollincrement=self.cell_size, yscrollincrement=self.cell_size)
+        w, h = self.viewport_size()
+        for sb, needed, side, fill in [(self.grid_vsb, full_h > h, tk.RIGHT, tk.Y), (self.grid_hsb, full_w > w, tk.BOTTOM, tk.X)]:
+            if needed and not sb.winfo_ismapped(): sb.pack(side=side, fill=fill, before=self.canvas)
+            elif not needed and sb.winfo_ismapped(): sb.pack_forget()
+        if full_w <= w: self.canvas.xview_moveto(0)
+        if full_h <= h: self.canvas.yview_moveto(0)
+
+    def ensure_cursor_visible(self):
+        cs = self.cell_size
+        w, h = self.viewport_size()
+        x0, y0 = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        cx, cy = self.cursor_col * cs, self.cursor_row * cs
+        full_w, full_h = self.width * cs, self.height * cs
+        if full_w > w and (cx < x0 or cx + cs > x0 + w):
+            self.canvas.xview_moveto(max(0, cx + cs / 2 - w / 2) / full_w)
+        if full_h > h and (cy < y0 or cy + cs > y0 + h):
+            self.canvas.yview_moveto(max(0, cy + cs / 2 - h / 2) / full_h)
+
+    def visible_cells(self):
+        # Column and row ranges inside the viewport plus a small margin
+        cs = self.cell_size
+        w, h = self.viewport_size()
+        x0, y0 = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        c0 = max(0, int(x0 // cs) - GRID_CULL_MARGIN)
+        r0 = max(0, int(y0 // cs) - GRID_CULL_MARGIN)
+        c1 = min(self.width, int((x0 + w) // cs) + 1 + GRID_CULL_MARGIN)
+        r1 = min(self.height, int((y0 + h) // cs) + 1 + GRID_CULL_MARGIN)
+        return range(c0, c1), range(r0, r1)
+
+    def refresh_grid(self, follow_cursor=False):
+        # Only cursor moves scroll the view; scroll and resize repaints leave it where the user put it
         if not self.puzzle: return
-        self.canvas.delete("all")
-        self.canvas.config(width=self.width * self.cell_size, height=self.height * self.cell_size)
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
-        
-        c = self.c 
-        fnt_num = font.Font(family="Arial", size=int(self.cell_size*0.28))
-        fnt_char = font.Font(family="Helvetica", size=int(self.cell_size*0.55), weight="normal")
-
-        for r in range(self.height):
-            for c_idx in range(self.width):
-                x1 = c_idx * self.cell_size
-                y1 = r * self.cell_size
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-                
-                idx = self.get_index(c_idx, r)
-                cell_val = self.user_grid[idx]
-                sol_val = self.solution_grid[idx]
-                
-                bg_color = c['grid_bg']
-                if sol_val == '.':
-                    bg_color = c['black_sq']
-                elif r == self.cursor_row and c_idx == self.cursor_col:
-                    bg_color = c['cursor']
-                elif self.is_highlighted(c_idx, r):
-                    bg_color = c['highlight']
-                elif idx in self.highlighted_ref_indices:
-                    bg_color = c['ref_highlight']
-                
-                self.canvas.create_rectangle(x1, y1, x2, y2, fill=bg_color, outline="#555555")
-
-                if (c_idx, r) in self.grid_numbers:
-                    self.canvas.create_text(x1+2, y1+1, anchor="nw", text=str(self.grid_numbers[(c_idx,r)]), font=fnt_num, fill=c['grid_num'])
-
-                if cell_val not in ['-', '.']:
-                    text_color = c['grid_fg']
-                    if self.var_error_check.get() and not self.is_redacted:
-                        if cell_val != sol_val:
-                            text_color = c['error']
-                    
-                    self.canvas.create_text(x1 + self.cell_size/2, y1 + self.cell_size/2 + 2, 
-                                            text=cell_val, font=fnt_char, fill=text_color)
+        self.update_grid_scrollbars()
+        if follow_cursor: self.ensure_cursor_visible()
+        cols, rows = self.visible_cells()
+        if self.var_renderer.get() == "tiles":
+            self.tile_renderer().render(cols, rows)
+        else:
+            self.draw_grid_items(cols, rows)
         self.check_completed_clues()
 
-    def check_completed_clues(self):
+    def current_word_cells(self):
+        if self.solution_grid[self.get_index(self.cursor_col, self.cursor_row)] == '.': return set()
+        return {self.get_index(col, row) for col, row in self.get_word_range(self.cursor_col, self.cursor_row, self.direction)}
+
+    def cell_style(self, idx, c_idx, r, word_cells):
+        # (background, letter or None, letter color, clue number or None) -- shared by both renderers
+        c = self.c
+        cell_val = self.user_grid[idx]
+        sol_val = self.solution_grid[idx]
+        if sol_val == '.':
+            return c['black_sq'], None, None, None
+        bg_color = c['grid_bg']
+        if r == self.cursor_row and c_idx == self.cursor_col:
+            bg_color = c['cursor']
+        elif idx in word_cells:
+            bg_color = c['highlight']
+        elif idx in self.highlighted_ref_indices:
+            bg_color = c['ref_highlight']
+        letter, text_color = None, None
+        if cell_val not in ['-', '.']:
+            letter, text_color = cell_val, c['grid_fg']
+            if self.var_error_check.get() and not self.is_redacted and cell_val != sol_val:
+                text_color = c['error']
+        return bg_color, letter, text_color, self.grid_numbers.get((c_idx, r))
+
+    def draw_grid_items(self, cols, rows):
+        self.canvas.delete("all")
+        word_cells = self.current_word_cells()
+        for r in rows:
+            for c_idx in cols:
+                self.draw_cell(self.get_index(c_idx, r), c_idx, r, word_cells)
+
+    def draw_cell(self, idx, c_idx, r, word_cells):
+        # Every item of a cell carries its "cell<idx>" tag so it can be redrawn on its own
+        c = self.c
+        fnt_num, fnt_char = self.grid_fonts()
+        x1 = c_idx * self.cell_size
+        y1 = r * self.cell_size
+        x2 = x1 + self.cell_size
+        y2 = y1 + self.cell_size
+        tag = f"cell{idx}"
+        bg_color, letter, text_color, num = self.cell_style(idx, c_idx, r, word_cells)
+
+        self.canvas.create_rectangle(x1, y1, x2, y2, fill=bg_color, outline=GRID_LINE_COLOR, tags=tag)
+
+        if num is not None:
+            self.canvas.create_text(x1+2, y1+1, anchor="nw", text=str(num), font=fnt_num, fill=c['grid_num'], tags=tag)
+
+        if letter is not None:
+            self.canvas.create_text(x1 + self.cell_size/2, y1 + self.cell_size/2 + 2,
+                                    text=letter, font=fnt_char, fill=text_color, tags=tag)
+
+    def refresh_cells(self, cells):
+        # Repaints just the given cells, e.g. a batch of co-op edits; cursor and view are unchanged
         if not self.puzzle: return
-        def check_list(clue_list, direction):
-            txt_widget = self.txt_across if direction == 'across' else self.txt_down
-            for clue in clue_list:
-                start_cell = clue['cell']
-                r = start_cell // self.width
-                c = start_cell % self.width
-                is_filled = True
-                curr_r, curr_c = r, c
-                while 0 <= curr_r < self.height and 0 <= curr_c < self.width:
-                    idx = self.get_index(curr_c, curr_r)
-                    if self.solution_grid[idx] == '.': break
-                    if self.user_grid[idx] in ['-', '.']:
-                        is_filled = False
-                        break
-                    if direction == 'across': curr_c += 1
-                    else: curr_r += 1
-                tag_name = f"{direction}_{clue['num']}"
-                ranges = txt_widget.tag_ranges(tag_name)
-                if ranges:
-                    if is_filled: txt_widget.tag_add("completed", ranges[0], ranges[1])
-                    else: txt_widget.tag_remove("completed", ranges[0], ranges[1])
-        check_list(self.clue_mapping.across, 'across')
-        check_list(self.clue_mapping.down, 'down')
-
-    def is_highlighted(self, col, row):
-        if self.solution_grid[self.get_index(col, row)] == '.': return False
-        if self.direction == 'across':
-            if row != self.cursor_row: return False
-            start_c = self.cursor_col
-            while start_c > 0 and self.solution_grid[self.get_index(start_c-1, row)] != '.': start_c -= 1
-            end_c = self.cursor_col
-            while end_c < self.width - 1 and self.solution_grid[self.get_index(end_c+1, row)] != '.': end_c += 1
-            return start_c <= col <= end_c
+        cols, rows = self.visible_cells()
+        if self.var_renderer.get() == "tiles":
+            self.tile_renderer().render_cells(cells)
         else:
-            if col != self.cursor_col: return False
-            start_r = self.cursor_row
-            while start_r > 0 and self.solution_grid[self.get_index(col, start_r-1)] != '.': start_r -= 1
-            end_r = self.cursor_row
-            while end_r < self.height - 1 and self.solution_grid[self.get_index(col, end_r+1)] != '.': end_r += 1
-            return start_r <= row <= end_r
+            word_cells = self.current_word_cells()
+            for idx in cells:
+                r, c_idx = divmod(idx, self.width)
+                if c_idx in cols and r in rows:
+                    self.canvas.delete(f"cell{idx}")
+                    self.draw_cell(idx, c_idx, r, word_cells)
+        self.check_completed_clues()
+
+    def grid_fonts(self):
+        # Named Tk fonts are created once per cell size instead of on every repaint
+        if self.cell_size not in self.grid_font_cache:
+            self.grid_font_cache = {self.cell_size: (
+                font.Font(family="Arial", size=int(self.cell_size*0.28)),
+                font.Font(family="Helvetica", size=int(self.cell_size*0.55), weight="normal"))}
+        return self.grid_font_cache[self.cell_size]
+
+    def tile_renderer(self):
+        renderer = self.tile_renderers.get(self.canvas)
+        if renderer is None:
+            self.canvas.delete("all")
+            renderer = self.tile_renderers[self.canvas] = TileGridRenderer(self, self.canvas)
+        return renderer
+
+    def change_renderer(self):
+        # Both backends own every item on the canvas, so start from a clean one
+        for canvas in list(self.tile_renderers): canvas.delete("all")
+        self.tile_renderers.clear()
+        self.refresh_grid()
+        self.save_settings()
+
+    def check_completed_clues(self):
+        # Only entries whose filled state changed since the last call are retagged
+        if not self.puzzle or not self.entry_index.dirty: return
+        index = self.entry_index
+        for ordinal in index.dirty:
+            direction = index.direction_of(ordinal)
+            if direction == 'across': txt_widget, clue = self.txt_across, self.clue_mapping.across[ordinal]
+            else: txt_widget, clue = self.txt_down, self.clue_mapping.down[ordinal - index.num_across]
+            ranges = txt_widget.tag_ranges(f"{direction}_{clue['num']}")
+            if ranges:
+                if not index.empty[ordinal]: txt_widget.tag_add("completed", ranges[0], ranges[1])
+                else: txt_widget.tag_remove("completed", ranges[0], ranges[1])
+        index.dirty = set()
 
     def is_locked(self, idx):
         return self.var_error_check.get() and not self.is_redacted and self.user_grid[idx] == self.solution_grid[idx]
@@ -681,8 +3019,47 @@ class CrosswordApp:
             while end_r < self.height - 1 and self.solution_grid[self.get_index(c, end_r+1)] != '.': end_r += 1
             return [(c, row) for row in range(start_r, end_r + 1)]
 
+    def set_cell(self, idx, char):
+        # Every single-cell edit goes through here so the entry index, undo history and journal stay current.
+        # Edits from co-op partners are journaled but not undoable.
+        old = self.user_grid[idx]
+        if old == char: return
+        self.user_grid[idx] = char
+        self.entry_index.update(idx, old, char)
+        if self.history and not self.coop_applying and not self.history_applying: self.history.record(idx, old, char)
+        if self.journal: self.journal.log(idx, char, self.user_grid)
+        if self.coop and not self.coop_applying:
+            self.coop_pending[idx] = self.coop.send(idx, char)
+
+    def undo_edit(self, event=None):
+        if self.puzzle and self.history and self.history.undo:
+            if self.recorder: self.recorder.log("undo")
+            group = self.history.undo.pop()
+            self.apply_history(group, redo=False)
+            self.history.redo.append(group)
+        return "break"
+
+    def redo_edit(self, event=None):
+        if self.puzzle and self.history and self.history.redo:
+            if self.recorder: self.recorder.log("redo")
+            group = self.history.redo.pop()
+            self.apply_history(group, redo=True)
+            self.history.undo.append(group)
+        return "break"
+
+    def apply_history(self, group, redo):
+        self.history_applying = True
+        try:
+            for idx, old, new in (group if redo else reversed(group)): self.set_cell(idx, new if redo else old)
+        finally: self.history_applying = False
+        if len(group) == 1: self.cursor_row, self.cursor_col = divmod(group[0][0], self.width)
+        self.refresh_grid(follow_cursor=True)
+        self.update_clue_display()
+
     def is_word_locked(self, c, r, direction):
         if not self.var_error_check.get() or self.is_redacted: return False
+        ordinal = self.entry_index.entry_at(self.get_index(c, r), direction)
+        if ordinal is not None: return self.entry_index.is_solved(ordinal)
         coords = self.get_word_range(c, r, direction)
         for col, row in coords:
             idx = self.get_index(col, row)
@@ -691,6 +3068,7 @@ class CrosswordApp:
 
     def handle_keypress(self, event):
         if not self.puzzle: return
+        if self.recorder: self.recorder.log("key", event.keysym, event.char, event.state)
         key = event.keysym
         
         is_shift = (event.state & 0x0001) or (event.state & 1)
@@ -717,7 +3095,7 @@ class CrosswordApp:
                 return "break"
             
             idx = self.get_index(self.cursor_col, self.cursor_row)
-            if not self.is_locked(idx): self.user_grid[idx] = '-'
+            if not self.is_locked(idx): self.set_cell(idx, '-')
             
             # --- FIXED BACKSPACE MOVEMENT LOGIC ---
             dr, dc = (0, -1) if self.direction == 'across' else (-1, 0)
@@ -730,17 +3108,17 @@ class CrosswordApp:
                     self.update_clue_display()
             # If hit black square or wall, DO NOT move (stay on current empty cell)
             
-            self.refresh_grid()
+            self.refresh_grid(follow_cursor=True)
         elif key == "Delete":
             idx = self.get_index(self.cursor_col, self.cursor_row)
             if not self.is_locked(idx):
-                self.user_grid[idx] = '-'
+                self.set_cell(idx, '-')
                 self.refresh_grid()
         elif len(event.char) == 1 and event.char.isalpha():
             char = event.char.upper()
             idx = self.get_index(self.cursor_col, self.cursor_row)
             if not self.is_locked(idx):
-                self.user_grid[idx] = char
+                self.set_cell(idx, char)
                 self.refresh_grid()
             self.step_forward()
         return "break"
@@ -758,7 +3136,7 @@ class CrosswordApp:
             if self.solution_grid[idx] != '.':
                 self.cursor_row, self.cursor_col = r, c
                 self.update_clue_display()
-                self.refresh_grid()
+                self.refresh_grid(follow_cursor=True)
                 return
             if r == self.cursor_row and c == self.cursor_col: break
 
@@ -779,13 +3157,13 @@ class CrosswordApp:
                 if self.solution_grid[idx] != '.':
                     self.cursor_row, self.cursor_col = search_r, search_c
                     self.update_clue_display()
-                    self.refresh_grid()
+                    self.refresh_grid(follow_cursor=True)
                     return
             self.move_smart(dr, dc)
         else:
             self.cursor_row, self.cursor_col = nr, nc
             self.update_clue_display()
-            self.refresh_grid()
+            self.refresh_grid(follow_cursor=True)
 
     def reveal_current_letter(self, event):
         if not self.puzzle: return
@@ -794,32 +3172,42 @@ class CrosswordApp:
         idx = self.get_index(self.cursor_col, self.cursor_row)
         correct_char = self.solution_grid[idx]
         if correct_char == '.': return
-        self.user_grid[idx] = correct_char
+        self.set_cell(idx, correct_char)
         self.refresh_grid()
         self.step_forward()
         return "break"
 
+    def menu_reveal_word(self):
+        # Ctrl-reveals are recorded as the key; only the menu path is logged here
+        if self.recorder and self.puzzle: self.recorder.log("reveal_word")
+        self.reveal_current_word()
+
     def reveal_current_word(self):
         if not self.puzzle: return
         if self.is_redacted:
             messagebox.showinfo("Cannot Reveal", "Hidden answers.")
             return
         r, c = self.cursor_row, self.cursor_col
+        self.history.begin()
+        try: self.reveal_word_cells(r, c)
+        finally: self.history.end()
+        self.refresh_grid()
+
+    def reveal_word_cells(self, r, c):
         if self.direction == 'across':
             start_c = c
             while start_c > 0 and self.solution_grid[self.get_index(start_c-1, r)] != '.': start_c -= 1
             end_c = c
             while end_c < self.width - 1 and self.solution_grid[self.get_index(end_c+1, r)] != '.': end_c += 1
             for col in range(start_c, end_c + 1):
-                self.user_grid[self.get_index(col, r)] = self.solution_grid[self.get_index(col, r)]
+                self.set_cell(self.get_index(col, r), self.solution_grid[self.get_index(col, r)])
         else:
             start_r = r
             while start_r > 0 and self.solution_grid[self.get_index(c, start_r-1)] != '.': start_r -= 1
             end_r = r
             while end_r < self.height - 1 and self.solution_grid[self.get_index(c, end_r+1)] != '.': end_r += 1
             for row in range(start_r, end_r + 1):
-                self.user_grid[self.get_index(c, row)] = self.solution_grid[self.get_index(c, row)]
-        self.refresh_grid()
+                self.set_cell(self.get_index(c, row), self.solution_grid[self.get_index(c, row)])
 
     def reveal_puzzle(self):
         if not self.puzzle: return
@@ -827,8 +3215,16 @@ class CrosswordApp:
             messagebox.showinfo("Cannot Reveal", "Hidden answers.")
             return
         if messagebox.askyesno("Reveal Puzzle", "Are you sure you want to reveal the entire puzzle?"):
-            self.user_grid = list(self.solution_grid)
-            self.refresh_grid()
+            if self.recorder: self.recorder.log("reveal_all")
+            self.reveal_all_cells()
+
+    def reveal_all_cells(self):
+        self.history.begin()
+        try:
+            for idx, ch in enumerate(self.solution_grid):
+                if ch != '.': self.set_cell(idx, ch)
+        finally: self.history.end()
+        self.refresh_grid()
 
     def move_cursor(self, dr, dc):
         new_r = self.cursor_row + dr
@@ -837,115 +3233,59 @@ class CrosswordApp:
             if self.solution_grid[self.get_index(new_c, new_r)] != '.':
                 self.cursor_row = new_r
                 self.cursor_col = new_c
-                self.refresh_grid()
+                self.refresh_grid(follow_cursor=True)
                 self.update_clue_display()
 
     def step_forward(self):
         dr, dc = (0, 1) if self.direction == 'across' else (1, 0)
-        r, c = self.cursor_row, self.cursor_col
-        while True:
-            r += dr
-            c += dc
-            hit_block = False
-            if not (0 <= r < self.height and 0 <= c < self.width): hit_block = True
-            elif self.solution_grid[self.get_index(c, r)] == '.': hit_block = True
-            if hit_block:
-                if self.var_end_behavior.get() == "next": self.jump_to_next_word(forward=True, skip_full_words=True)
-                return
-            idx = self.get_index(c, r)
-            if self.var_skip_filled.get() and self.user_grid[idx] not in ['-', '.']: continue
-            else:
-                self.cursor_row, self.cursor_col = r, c
-                self.refresh_grid()
-                self.update_clue_display()
-                return
+        r, c = self.cursor_row + dr, self.cursor_col + dc
+        hit_block = not (0 <= r < self.height and 0 <= c < self.width) or self.solution_grid[self.get_index(c, r)] == '.'
+        if not hit_block and self.var_skip_filled.get():
+            next_idx = self.entry_index.next_empty(self.get_index(self.cursor_col, self.cursor_row), self.direction)
+            if next_idx is None: hit_block = True
+            else: r, c = next_idx // self.width, next_idx % self.width
+        if hit_block:
+            if self.var_end_behavior.get() == "next": self.jump_to_next_word(forward=True, skip_full_words=True)
+            return
+        self.cursor_row, self.cursor_col = r, c
+        self.refresh_grid(follow_cursor=True)
+        self.update_clue_display()
 
-    def jump_to_next_word(self, forward=True, visited_indices=None, skip_full_words=False):
-        if not self.puzzle: return
-        current_idx = self.get_index(self.cursor_col, self.cursor_row)
-        if visited_indices is None: visited_indices = {current_idx}
-        start_idx = current_idx
-        if self.direction == 'across':
-            c = self.cursor_col
-            while c >= 0 and self.solution_grid[self.get_index(c, self.cursor_row)] != '.':
-                start_idx = self.get_index(c, self.cursor_row)
-                c -= 1
-            current_list = self.clue_mapping.across
-            next_list = self.clue_mapping.down
-            next_direction = 'down'
-        else: 
-            r = self.cursor_row
-            while r >= 0 and self.solution_grid[self.get_index(self.cursor_col, r)] != '.':
-                start_idx = self.get_index(self.cursor_col, r)
-                r -= 1
-            current_list = self.clue_mapping.down
-            next_list = self.clue_mapping.across
-            next_direction = 'across'
-        current_clue_index = -1
-        for i, clue in enumerate(current_list):
-            if clue['cell'] == start_idx:
-                current_clue_index = i
-                break
-        next_clue = None
-        if forward:
-            if current_clue_index != -1 and current_clue_index < len(current_list) - 1:
-                next_clue = current_list[current_clue_index + 1]
-            else:
-                if len(next_list) > 0:
-                    next_clue = next_list[0]
-                    self.direction = next_direction 
-                else:
-                    if len(current_list) > 0: next_clue = current_list[0]
+    def jump_to_next_word(self, forward=True, skip_full_words=False):
+        if not self.puzzle or not self.entry_index: return
+        index = self.entry_index
+        total = len(index)
+        if total == 0: return
+        num_across = index.num_across
+        ordinal = index.entry_at(self.get_index(self.cursor_col, self.cursor_row), self.direction)
+        if ordinal is not None:
+            target = (ordinal + (1 if forward else -1)) % total
+        elif self.direction == 'across':
+            # Not inside a numbered entry: go to the first (last) entry of the other direction
+            has_other = total > num_across
+            target = (num_across if has_other else 0) if forward else (total - 1 if has_other else num_across - 1)
         else:
-            if current_clue_index > 0:
-                next_clue = current_list[current_clue_index - 1]
-            else:
-                if len(next_list) > 0:
-                    next_clue = next_list[-1]
-                    self.direction = next_direction
-                else:
-                    if len(current_list) > 0: next_clue = current_list[-1]
-        if next_clue:
-            start = next_clue['cell']
-            nr, nc = start // self.width, start % self.width
-            if skip_full_words and self.is_word_locked(nc, nr, self.direction):
-                new_idx = start
-                if new_idx not in visited_indices:
-                    self.cursor_row, self.cursor_col = nr, nc
-                    visited_indices.add(new_idx)
-                    self.jump_to_next_word(forward, visited_indices, skip_full_words)
-                    return
-            self.cursor_row = nr
-            self.cursor_col = nc
-            self.refresh_grid()
-            self.update_clue_display()
-            if self.var_skip_filled.get():
-                dr, dc = (0, 1) if self.direction == 'across' else (1, 0)
-                temp_r, temp_c = self.cursor_row, self.cursor_col
-                idx = self.get_index(temp_c, temp_r)
-                if self.user_grid[idx] in ['-', '.']: return
-                found_empty = False
-                while True:
-                    next_r, next_c = temp_r + dr, temp_c + dc
-                    if not (0 <= next_r < self.height and 0 <= next_c < self.width) or \
-                       self.solution_grid[self.get_index(next_c, next_r)] == '.': break
-                    idx_next = self.get_index(next_c, next_r)
-                    if self.user_grid[idx_next] in ['-', '.']:
-                        self.cursor_row = next_r
-                        self.cursor_col = next_c
-                        found_empty = True
-                        break
-                    temp_r, temp_c = next_r, next_c
-                if found_empty:
-                    self.refresh_grid()
-                    self.update_clue_display()
-                else:
-                    pass
+            has_other = num_across > 0
+            target = (0 if has_other else num_across) if forward else (num_across - 1 if has_other else total - 1)
+
+        if skip_full_words and self.var_error_check.get() and not self.is_redacted:
+            unsolved = index.next_unsolved(target, forward)
+            if unsolved is not None: target = unsolved
+
+        self.direction = index.direction_of(target)
+        start = index.starts[target]
+        if self.var_skip_filled.get():
+            empty = index.first_empty(target)
+            if empty is not None: start = empty
+        self.cursor_row, self.cursor_col = start // self.width, start % self.width
+        self.refresh_grid(follow_cursor=True)
+        self.update_clue_display()
             
     def on_click(self, event):
         if not self.puzzle: return
-        c = event.x // self.cell_size
-        r = event.y // self.cell_size
+        if self.recorder: self.recorder.log("click", self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        c = int(self.canvas.canvasx(event.x) // self.cell_size)
+        r = int(self.canvas.canvasy(event.y) // self.cell_size)
         if 0 <= c < self.width and 0 <= r < self.height:
             if self.solution_grid[self.get_index(c, r)] == '.': return
             if c == self.cursor_col and r == self.cursor_row:
@@ -983,6 +3323,7 @@ class CrosswordApp:
                 break
         
         self.lbl_current_clue.config(text=found_clue)
+        self.update_suggestions(found_clue_text)
         self.highlight_text_widget(self.txt_across, clue_num, self.direction == 'across')
         self.highlight_text_widget(self.txt_down, clue_num, self.direction == 'down')
         
@@ -1045,7 +3386,257 @@ class CrosswordApp:
             txt_widget.tag_add("highlight", ranges[0], ranges[1])
             txt_widget.see(ranges[0])
 
+def benchmark_renderers(sizes=(15, 25, 50, 100), repeats=30):
+    # Times cursor moves and letter entry with each grid backend on synthetic puzzles.
+    # Runs in a scratch directory so settings and saves of the real install are untouched.
+    import tempfile
+    import random
+    import statistics
+    os.chdir(tempfile.mkdtemp(prefix="puz-bench-"))
+    root = tk.Tk()
+    app = CrosswordApp(root)
+    root.update()
+    rnd = random.Random(0)
+    print(f"{'grid':>9} {'backend':>8} {'move ms':>9} {'type ms':>9} {'items':>7}")
+    for n in sizes:
+        app.load_puz_file(f"bench_{n}x{n}.puz", puzzle=make_synthetic_puzzle(n, n, seed=n))
+        open_cells = [i for i, ch in enumerate(app.solution_grid) if ch != '.']
+        for backend in ("canvas", "tiles"):
+            app.var_renderer.set(backend)
+            app.change_renderer()
+            root.update()
+            moves, types = [], []
+            for _ in range(repeats):
+                idx = rnd.choice(open_cells)
+                t = time.perf_counter()
+                app.cursor_row, app.cursor_col = divmod(idx, app.width)
+                app.refresh_grid()
+                root.update_idletasks()
+                moves.append(time.perf_counter() - t)
+
+                t = time.perf_counter()
+                app.set_cell(idx, rnd.choice("ABCDE"))
+                app.refresh_grid()
+                root.update_idletasks()
+                types.append(time.perf_counter() - t)
+            items = len(app.canvas.find_all())
+            print(f"{n:>4}x{n:<4} {backend:>8} {statistics.median(moves)*1000:9.2f} {statistics.median(types)*1000:9.2f} {items:7d}", flush=True)
+    root.destroy()
+
+def replay_session(path, speed="max"):
+    # Replays a SessionRecorder log into a fresh app (run under a virtual display such as
+    # xvfb-run on CI). Reports per-event latency, handler plus Tk redraw, by event kind and
+    # returns True when the final grid matches the recorded one, or None when a puzzle the
+    # recording uses can't be opened.
+    import tempfile
+    import statistics
+    with open(path) as f: lines = [json.loads(line) for line in f if line.strip()]
+    header, events = lines[0], lines[1:]
+    footer = events.pop() if events and isinstance(events[-1], dict) else None
+    # Checked up front: inside the app a bad file means a modal error box
+    for file_path in sorted({header["file"]} | {record[2] for record in events if record[1] == "file"}):
+        try: read_puzzle(file_path)
+        except Exception as e:
+            print(f"replay: cannot open {file_path}: {e}", file=sys.stderr)
+            return None
+    os.chdir(tempfile.mkdtemp(prefix="puz-replay-"))
+    root = tk.Tk()
+    app = CrosswordApp(root)
+    while not app.saves_loaded: root.update()
+
+    settings = header["settings"]
+    app.var_error_check.set(settings["error_check"])
+    app.var_skip_filled.set(settings["skip_filled"])
+    app.var_end_behavior.set(settings["end_behavior"])
+    app.var_ctrl_mode.set(settings["ctrl_mode"])
+    app.cell_size = settings["cell_size"]
+
+    def restore(file_path, grid):
+        if os.path.abspath(app.current_file_path or "") != file_path: app.load_puz_file(file_path)
+        app.user_grid = list(grid)
+        app.entry_index.rebuild(app.user_grid)
+
+    restore(header["file"], header["grid"])
+    # Undo may reach back past the start of the recording
+    history = header.get("history", {})
+    app.history.undo.extend([tuple(delta) for delta in group] for group in history.get("undo", []))
+    app.history.redo = [[tuple(delta) for delta in group] for group in history.get("redo", [])]
+    app.cursor_col, app.cursor_row = header["cursor"]
+    app.direction = header["direction"]
+    app.refresh_grid()
+    app.update_clue_display()
+    root.update()
+
+    latencies = {}
+    t_start = time.perf_counter()
+    for record in events:
+        t, kind, fields = record[0], record[1], record[2:]
+        if speed == "recorded":
+            while time.perf_counter() - t_start < t: root.update()
+        ev = tk.Event()
+        ev.widget, ev.state, ev.keysym, ev.char = app.canvas, 0, "", ""
+        started = time.perf_counter()
+        if kind == "key":
+            ev.keysym, ev.char, ev.state = fields
+            app.handle_keypress(ev)
+        elif kind == "tab":
+            ev.state = fields[0]
+            app.handle_tab(ev)
+        elif kind == "ctrl":
+            ev.keysym = fields[0]
+            app.handle_ctrl_key(ev)
+        elif kind == "click":
+            ev.x = int(fields[0] - app.canvas.canvasx(0))
+            ev.y = int(fields[1] - app.canvas.canvasy(0))
+            app.on_click(ev)
+        elif kind == "clue":
+            app.click_clue_text(*fields)
+        elif kind == "reveal_word":
+            app.reveal_current_word()
+        elif kind == "reveal_all":
+            app.reveal_all_cells()
+        elif kind == "reset":
+            app.clear_all_cells()
+        elif kind == "undo":
+            app.undo_edit()
+        elif kind == "redo":
+            app.redo_edit()
+        elif kind == "file":
+            file_path, grid = fields
+            name = os.path.basename(file_path)
+            if file_path in app.sessions:
+                app.switch_session(file_path)
+            elif app.sidebar_folder is not None and os.path.abspath(app.sidebar_folder) == os.path.dirname(file_path) and name in app.sidebar_files:
+                pos = app.sidebar_files.index(name)
+                app.file_listbox.selection_clear(0, tk.END)
+                app.file_listbox.selection_set(pos)
+                app.on_file_select(ev)
+            else:
+                app.load_puz_file(file_path)
+        root.update_idletasks()
+        latencies.setdefault(kind, []).append(time.perf_counter() - started)
+        # Saves live in the scratch directory, so pin the grid a file switch produced while recording
+        if kind == "file": restore(file_path, grid)
+
+    print(f"{'event':>6} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for kind, values in sorted(latencies.items()):
+        values.sort()
+        def pct(p): return values[min(len(values) - 1, int(p * len(values)))] * 1000
+        print(f"{kind:>6} {len(values):6d} {pct(0.5):8.2f} {pct(0.95):8.2f} {pct(0.99):8.2f} {values[-1]*1000:8.2f}")
+    all_values = [v for values in latencies.values() for v in values]
+    if all_values: print(f"{'all':>6} {len(all_values):6d} {statistics.median(all_values)*1000:8.2f}")
+
+    ok = True
+    if footer is not None:
+        ok = "".join(app.user_grid) == footer["grid"]
+        print("final grid matches recording" if ok else "final grid DIFFERS from recording")
+    root.destroy()
+    return ok
+
+def rss_bytes():
+    # Resident set size on Linux; 0 where /proc is unavailable
+    try:
+        with open("/proc/self/statm") as f: pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError): return 0
+
+def soak_test(iterations=2000, distinct=40, size=15, rss_slack=16 * 1024 * 1024, command_slack=8):
+    # Cycles through more puzzles than fit in the session LRU and checks that RSS and the
+    # number of Tcl commands stop growing once warmed up. Returns True when both stay flat.
+    import tempfile
+    import gc
+    os.chdir(tempfile.mkdtemp(prefix="puz-soak-"))
+    paths = []
+    for i in range(distinct):
+        path = os.path.abspath(f"soak_{i:03d}.puz")
+        make_synthetic_puzzle(size, size, seed=i).save(path)
+        paths.append(path)
+    root = tk.Tk()
+    app = CrosswordApp(root)
+    root.update()
+
+    def sample():
+        gc.collect()
+        root.update()
+        return rss_bytes(), len(root.tk.call("info", "commands"))
+
+    warmup = max(distinct * 2, iterations // 5)
+    base = None
+    for i in range(iterations):
+        app.load_puz_file(paths[i % distinct])
+        app.jump_to_next_word(forward=True, skip_full_words=True)
+        root.update()
+        if i + 1 == warmup: base = sample()
+        if (i + 1) % 500 == 0:
+            rss, cmds = sample()
+            print(f"{i + 1:6d} loads  rss {rss / 1e6:8.1f} MB  tcl commands {cmds}", flush=True)
+    end = sample()
+    root.destroy()
+    if base is None: base = end
+    rss_growth, cmd_growth = end[0] - base[0], end[1] - base[1]
+    ok = rss_growth <= rss_slack and cmd_growth <= command_slack
+    print(f"after warmup: rss {rss_growth / 1e6:+.1f} MB, tcl commands {cmd_growth:+d} -> {'OK' if ok else 'LEAK'}")
+    return ok
+
 if __name__ == "__main__":
+    import argparse
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Python .puz Solver")
+    parser.add_argument("--startup-report", action="store_true", help="print time to first paint and time to interactive")
+    parser.add_argument("--benchmark-renderers", nargs="*", type=int, metavar="N",
+                        help="compare the canvas and tile grid backends on NxN grids (default: 15 25 50 100)")
+    parser.add_argument("--coop-server", metavar="[HOST:]PORT", help="run the co-op server instead of the app")
+    parser.add_argument("--coop-loadtest", metavar="HOST:PORT", help="simulate many typists against a co-op server")
+    parser.add_argument("--loadtest-rooms", type=int, default=50)
+    parser.add_argument("--loadtest-typists", type=int, default=200)
+    parser.add_argument("--loadtest-seconds", type=float, default=10.0)
+    parser.add_argument("--export-dataset", nargs=2, metavar=("FOLDER", "OUT_DIR"),
+                        help="export every puzzle below FOLDER, with saved progress, to a sharded dataset")
+    parser.add_argument("--export-workers", type=int, default=None)
+    parser.add_argument("--analyze-library", metavar="FOLDER",
+                        help="compute difficulty and structure statistics for every puzzle below FOLDER")
+    parser.add_argument("--replay", metavar="RECORDING", help="replay a recorded session and report per-event latency")
+    parser.add_argument("--replay-speed", choices=["max", "recorded"], default="max")
+    parser.add_argument("--soak-test", nargs="?", type=int, const=2000, metavar="LOADS",
+                        help="reload puzzles in a loop and check RSS and Tcl command count stay flat")
+    args = parser.parse_args()
+
+    if args.soak_test is not None:
+        raise SystemExit(0 if soak_test(args.soak_test) else 1)
+
+    if args.analyze_library:
+        analyze_library(args.analyze_library, workers=args.export_workers)
+        raise SystemExit
+
+    if args.export_dataset:
+        export_dataset(*args.export_dataset, workers=args.export_workers)
+        raise SystemExit
+
+    if args.replay:
+        # 0: final grid matches, 1: it differs, 2: a puzzle in the recording can't be opened
+        ok = replay_session(args.replay, args.replay_speed)
+        raise SystemExit(2 if ok is None else 0 if ok else 1)
+
+    if args.coop_server or args.coop_loadtest:
+        import asyncio
+        if args.coop_server:
+            host, port = parse_host_port(args.coop_server, default_host="0.0.0.0")
+            try: asyncio.run(CoopServer().serve(host, port))
+            except KeyboardInterrupt: pass
+        else:
+            host, port = parse_host_port(args.coop_loadtest)
+            asyncio.run(coop_load_test(host, port, args.loadtest_rooms, args.loadtest_typists, args.loadtest_seconds))
+        raise SystemExit
+
+    if args.benchmark_renderers is not None:
+        benchmark_renderers(args.benchmark_renderers or (15, 25, 50, 100))
+        raise SystemExit
+
     root = tk.Tk()
     app = CrosswordApp(root)
+    if args.startup_report:
+        def report():
+            if "interactive" in app.startup_times: print(app.startup_report(), flush=True)
+            else: root.after(50, report)
+        root.after(50, report)
     root.mainloop()